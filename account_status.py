@@ -0,0 +1,68 @@
+import time
+import threading
+
+from flask import current_app
+
+from extensions import db
+from models import Partner, Employee
+
+# admin ka status column nahi hai, unke token sirf expiry se khatam hote hain
+STATUS_MODELS = {
+    "partner": Partner,
+    "employee": Employee,
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_status(role, user_id):
+    """Return (status, token_version) for a user, cached per worker.
+
+    None if the account no longer exists.
+    """
+    key = (role, str(user_id))
+    now = time.monotonic()
+
+    with _lock:
+        hit = _cache.get(key)
+    if hit and hit[1] > now:
+        return hit[0]
+
+    model = STATUS_MODELS[role]
+    row = (
+        db.session.query(model.status, model.token_version)
+        .filter(model.id == user_id)
+        .first()
+    )
+    value = (row.status, row.token_version or 0) if row else None
+
+    ttl = current_app.config["ACCOUNT_STATUS_CACHE_TTL"]
+    with _lock:
+        _cache[key] = (value, now + ttl)
+    return value
+
+
+def invalidate(role, user_id):
+    with _lock:
+        _cache.pop((role, str(user_id)), None)
+
+
+def set_status(user, status):
+    """Change an account's status and revoke its live tokens if it is no longer active."""
+    if user.status != status and status != "active":
+        user.token_version = (user.token_version or 0) + 1
+    user.status = status
+
+
+def is_token_revoked(jwt_payload):
+    role = jwt_payload.get("role")
+    if role not in STATUS_MODELS:
+        return False
+
+    value = get_status(role, jwt_payload.get("sub"))
+    if value is None:
+        return True
+
+    status, version = value
+    return status != "active" or jwt_payload.get("ver", 0) != version
@@ -1,37 +1,47 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from models import Partner, Lead, Payment, Admin, Employee, Course
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, Response, stream_with_context, abort
+from models import Partner, Lead, Payment, Admin, Employee, Course, normalize_mobile
 from extensions import db
 from sqlalchemy.exc import IntegrityError
-from auth.routes import role_required
-from flask_jwt_extended import get_jwt_identity
-from sqlalchemy import func
-from datetime import datetime
-from decimal import Decimal
+from auth.routes import role_required, current_identity
+from sqlalchemy import func, update
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+import csv
+import io
+from pagination import keyset_page, parse_date
+from streaming import stream_page
+from compression import gzip_stream
+from replica import replica_reads
+import counters
+import account_status
+import data_version
+import profiler
+import ledger
+from employee.routes import wants_json
 
 admin_bp = Blueprint("admin", __name__, template_folder="templates/admin")
 
 @admin_bp.route("/panel")
 @role_required("admin")
 def panel():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
 
-    total_partners = Partner.query.count()
-    total_leads = Lead.query.count()
-    total_converted = Lead.query.filter_by(status="Converted").count()
-    pending_payments = Payment.query.filter_by(released=False).count()
+    # precomputed counters, write paths inhe same transaction me update karte hain
+    stats = counters.read_all()
     return render_template("panel.html",
-                           total_partners=total_partners,
-                           total_leads=total_leads,
-                           total_converted=total_converted,
-                           pending_payments=pending_payments,
+                           total_partners=stats[counters.PARTNERS],
+                           total_leads=stats[counters.LEADS],
+                           total_converted=stats[counters.CONVERTED_LEADS],
+                           pending_payments=stats[counters.PENDING_PAYMENTS],
                            admin_name=admin_name
 )
 
 @admin_bp.route("/partners")
 @role_required("admin")
+@replica_reads
 def partners():
-    partners = Partner.query.all()
+    # rows render hote hue DB se aate hain, poori list memory me nahi
+    partners = Partner.query.order_by(Partner.id).yield_per(500)
 
     # partner-wise total leads
     total_leads = (
@@ -49,7 +59,7 @@ def partners():
             Lead.partner_id,
             func.count(Lead.id).label("converted")
         )
-        .filter(Lead.status == "converted")
+        .filter(Lead.status == "Converted")
         .group_by(Lead.partner_id)
         .all()
     )
@@ -58,10 +68,9 @@ def partners():
     total_leads_dict = {p: c for p, c in total_leads}
     converted_dict = {p: c for p, c in converted_leads}
 
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
 
-    return render_template("partners.html", partners=partners, total_leads= total_leads_dict, converted=converted_dict, admin_name=admin_name)
+    return stream_page("partners.html", partners=partners, total_leads= total_leads_dict, converted=converted_dict, admin_name=admin_name)
 
 @admin_bp.route("/partners/<int:partner_id>/status", methods=["POST"])
 @role_required("admin")
@@ -73,8 +82,9 @@ def update_partner_status(partner_id):
         return redirect(url_for("admin.partners"))
 
     partner = Partner.query.get_or_404(partner_id)
-    partner.status = status
+    account_status.set_status(partner, status)
     db.session.commit()
+    account_status.invalidate("partner", partner_id)
 
     flash(f"Partner status updated to {status.upper()}", "success")
     return redirect(url_for("admin.partners"))
@@ -82,14 +92,13 @@ def update_partner_status(partner_id):
 @admin_bp.route("/create_partner", methods=["GET", "POST"])
 @role_required("admin")
 def create_partner():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
     if request.method == "POST":
         name = request.form['name']
         mobile = request.form['mobile']
         password = request.form['password']
 
-        existing_partner = Partner.query.filter_by(mobile=mobile).first()
+        existing_partner = Partner.query.filter_by(mobile_normalized=normalize_mobile(mobile)).first()
         if existing_partner:
             flash("Mobile number already exists!", "danger")
             return redirect(url_for("admin.create_partner"))
@@ -99,6 +108,7 @@ def create_partner():
 
         try:
             db.session.add(partner)
+            counters.bump(counters.PARTNERS)
             db.session.commit()
             flash("Partner created successfully", "success")
             return redirect(url_for("admin.partners"))
@@ -108,14 +118,139 @@ def create_partner():
             return redirect(url_for("admin.create_partner"))
     return render_template("create_partner.html", admin_name=admin_name)
 
+def lead_filters_from_request():
+    return {
+        "status": request.args.get("status", ""),
+        "partner_id": request.args.get("partner_id", type=int),
+        "course_id": request.args.get("course_id", type=int),
+        "date_from": request.args.get("date_from", ""),
+        "date_to": request.args.get("date_to", ""),
+    }
+
+def apply_lead_filters(query, filters):
+    if filters["status"]:
+        query = query.filter(Lead.status == filters["status"])
+    if filters["partner_id"]:
+        query = query.filter(Lead.partner_id == filters["partner_id"])
+    if filters["course_id"]:
+        query = query.filter(Lead.course_id == filters["course_id"])
+
+    date_from = parse_date(filters["date_from"])
+    date_to = parse_date(filters["date_to"])
+    if date_from:
+        query = query.filter(Lead.created_at >= date_from)
+    if date_to:
+        # date_to is inclusive (whole day)
+        query = query.filter(Lead.created_at < date_to + timedelta(days=1))
+    return query
+
 @admin_bp.route("/leads")
 @role_required("admin")
+@replica_reads
 def leads():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
-    leads = Lead.query.all()
-    courses = Course.query.all()
-    return render_template("leads.html", leads=leads, courses=courses, admin_name=admin_name)
+    admin_name = current_identity().name
+
+    filters = lead_filters_from_request()
+    query = apply_lead_filters(Lead.query, filters)
+
+    leads, next_cursor = keyset_page(
+        query, Lead.created_at, Lead.id,
+        request.args.get("cursor"),
+        current_app.config["LEADS_PAGE_SIZE"]
+    )
+
+    courses = db.session.query(Course.id, Course.title).order_by(Course.title).all()
+    partners = db.session.query(Partner.id, Partner.name).order_by(Partner.name).all()
+
+    # filters ko next page link me carry karna hai
+    filter_args = {k: v for k, v in filters.items() if v}
+
+    return stream_page("leads.html",
+                           leads=leads,
+                           courses=courses,
+                           partners=partners,
+                           filters=filters,
+                           filter_args=filter_args,
+                           next_cursor=next_cursor,
+                           is_first_page=not request.args.get("cursor"),
+                           admin_name=admin_name)
+
+EXPORT_COLUMNS = [
+    ("Lead ID", Lead.id),
+    ("Created At", Lead.created_at),
+    ("Student", Lead.student_name),
+    ("Mobile", Lead.mobile),
+    ("Email", Lead.email),
+    ("Profession", Lead.current_status),
+    ("Address", Lead.address),
+    ("Status", Lead.status),
+    ("Payment Term", Lead.payment_term),
+    ("Remark", Lead.remark),
+    ("Partner ID", Lead.partner_id),
+    ("Partner", Partner.name),
+    ("Course", Course.title),
+    ("Course Price", Course.price),
+    ("Payment Amount", Payment.amount),
+    ("Payment Released", Payment.released),
+    ("Release Date", Payment.release_date),
+]
+
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_safe(value):
+    # Excel in cells ko formula samajh leta hai; ' lagane se text hi rehta hai
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def export_rows(filters, batch_size):
+    # ORM objects nahi, sirf columns; har batch ke baad buffer khali
+    query = apply_lead_filters(
+        db.session.query(*[col for _, col in EXPORT_COLUMNS])
+        .outerjoin(Partner, Lead.partner_id == Partner.id)
+        .outerjoin(Course, Lead.course_id == Course.id)
+        .outerjoin(Payment, Payment.lead_id == Lead.id),
+        filters
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(query, Lead.created_at, Lead.id, cursor, batch_size)
+        writer.writerows([csv_safe(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if not cursor:
+            break
+
+@admin_bp.route("/leads/export")
+@role_required("admin")
+@replica_reads
+def export_leads():
+    filters = lead_filters_from_request()
+    chunks = export_rows(filters, current_app.config["EXPORT_BATCH_SIZE"])
+    filename = f"leads-{datetime.utcnow():%Y%m%d-%H%M%S}.csv"
+
+    if request.args.get("gzip") in ("1", "true"):
+        body = gzip_stream(chunks)
+        mimetype = "application/gzip"
+        filename += ".gz"
+    else:
+        body = (chunk.encode("utf-8") for chunk in chunks)
+        mimetype = "text/csv"
+
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+LEAD_STATUSES = ["Pending", "In-Process", "Converted", "Not Converted"]
+FINAL_STATUSES = ["Converted", "Not Converted"]
+PAYMENT_TERMS = ["Cash", "Online", "Other"]
 
 @admin_bp.route("/update_lead/<int:lead_id>", methods=["POST"])
 @role_required("admin")
@@ -125,11 +260,12 @@ def update_lead(lead_id):
     course_id = request.form.get('course_id')
 
     lead = Lead.query.get_or_404(lead_id)
+    old_status = lead.status
 
     if new_status:
-        if lead.status in ["Converted", "Not Converted"] and new_status != lead.status:
+        if lead.status in FINAL_STATUSES and new_status != lead.status:
             flash("Lead status already finalized and cannot be changed.", "warning")
-            return redirect(url_for("admin.leads"))
+            return redirect(url_for("admin.leads", **request.args))
         lead.status = new_status
 
     # COURSE + PAYMENT ONLY IF CONVERTED
@@ -139,23 +275,213 @@ def update_lead(lead_id):
             lead.course_id = int(course_id)
 
         if payment_term:
-            if payment_term not in ["Cash", "Online", "Other"]:
+            if payment_term not in PAYMENT_TERMS:
                 flash("Invalid payment method.", "error")
-                return redirect(url_for("admin.leads"))
+                return redirect(url_for("admin.leads", **request.args))
             lead.payment_term = payment_term
 
+        # commission entry isi transaction me; dobara submit pe nayi row nahi banti
+        ledger.record_commission(lead)
+
+    if old_status != lead.status and "Converted" in (old_status, lead.status):
+        counters.bump(counters.CONVERTED_LEADS, 1 if lead.status == "Converted" else -1)
+
+    data_version.bump(lead.partner_id)
     db.session.commit()
     flash("Lead updated successfully.", "success")
-    return redirect(url_for("admin.leads"))
+    return redirect(url_for("admin.leads", **request.args))
+
+
+def bulk_update_response(summary, status=200):
+    if wants_json():
+        return jsonify(summary), status
+
+    if "error" in summary:
+        flash(summary["error"], "danger")
+    else:
+        flash(f"{summary['updated']} leads updated, {len(summary['failed'])} skipped.",
+              "success" if not summary["failed"] else "warning")
+        for failure in summary["failed"][:10]:
+            flash(f"Lead {failure['lead_id']}: {failure['error']}", "warning")
+    return redirect(url_for("admin.leads", **request.args))
+
+@admin_bp.route("/leads/bulk_update", methods=["POST"])
+@role_required("admin")
+def bulk_update_leads():
+    lead_ids = sorted(set(request.form.getlist("lead_ids", type=int)))
+    new_status = request.form.get("status") or None
+    course_id = request.form.get("course_id", type=int)
+    payment_term = request.form.get("payment_term") or None
+
+    if not lead_ids:
+        return bulk_update_response({"error": "Select at least one lead."}, 400)
+    if not (new_status or course_id or payment_term):
+        return bulk_update_response({"error": "Choose a status, course or payment term to apply."}, 400)
+    if new_status and new_status not in LEAD_STATUSES:
+        return bulk_update_response({"error": "Invalid status."}, 400)
+    if payment_term and payment_term not in PAYMENT_TERMS:
+        return bulk_update_response({"error": "Invalid payment method."}, 400)
+    if course_id and db.session.get(Course, course_id) is None:
+        return bulk_update_response({"error": "Invalid course."}, 400)
+
+    # update_lead wale hi rules, ek query me saari leads ke liye
+    current = {
+        r.id: r for r in db.session.query(Lead.id, Lead.status, Lead.partner_id).filter(Lead.id.in_(lead_ids))
+    }
+    failed, ok = [], []
+    for lead_id in lead_ids:
+        lead = current.get(lead_id)
+        if lead is None:
+            failed.append({"lead_id": lead_id, "error": "Lead not found."})
+        elif new_status and lead.status in FINAL_STATUSES and new_status != lead.status:
+            failed.append({"lead_id": lead_id, "error": "Lead status already finalized and cannot be changed."})
+        elif (course_id or payment_term) and (new_status or lead.status) != "Converted":
+            failed.append({"lead_id": lead_id, "error": "Course and payment term apply only to Converted leads."})
+        else:
+            ok.append(lead)
+
+    if ok:
+        values = {}
+        if new_status:
+            values["status"] = new_status
+        if course_id:
+            values["course_id"] = course_id
+        if payment_term:
+            values["payment_term"] = payment_term
+
+        ok_ids = [l.id for l in ok]
+        query = update(Lead).where(Lead.id.in_(ok_ids))
+        if new_status:
+            # finalized check WHERE me bhi, taaki beech ka concurrent update na pis jaye
+            query = query.where(db.or_(Lead.status == new_status, Lead.status.notin_(FINAL_STATUSES)))
+        result = db.session.execute(query.values(**values).execution_options(synchronize_session=False))
+        if result.rowcount != len(ok_ids):
+            db.session.rollback()
+            return bulk_update_response({"error": "Some leads changed meanwhile, please reload and retry."}, 409)
+
+        if new_status == "Converted":
+            # Converted final hai, koi lead usse bahar nahi jaati; sirf naye gine
+            newly_converted = sum(1 for l in ok if l.status != "Converted")
+            if newly_converted:
+                counters.bump(counters.CONVERTED_LEADS, newly_converted)
 
+        ledger.record_commissions(ok_ids)
+        data_version.bump_many(l.partner_id for l in ok)
+        db.session.commit()
+
+    return bulk_update_response({"updated": len(ok), "failed": failed})
 
 @admin_bp.route("/payments")
 @role_required("admin")
+@replica_reads
 def payments():
-    payments = Payment.query.all()
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
-    return render_template("payments.html", payments=payments, admin_name=admin_name)
+    payments = Payment.query.order_by(Payment.id).yield_per(500)
+    admin_name = current_identity().name
+    # preview ke baad wahi filters aur ticks form me wapas
+    return stream_page("payments.html", payments=payments, admin_name=admin_name,
+                       partners=Partner.query.order_by(Partner.name).all(),
+                       filters=request.args,
+                       selected=set(request.args.getlist("payment_ids", type=int)))
+
+RELEASE_FILTERS = ("partner_id", "date_from", "date_to", "min_amount")
+
+def payment_release_conditions():
+    """WHERE clauses for a bulk release: the filter (partner, created date
+    range, min amount) AND the ticked payment ids, whichever are given.
+    Returns (conditions, error)."""
+    conditions = [Payment.released == False]
+
+    ids = request.form.getlist("payment_ids", type=int)
+    if ids:
+        conditions.append(Payment.id.in_(ids))
+
+    partner_id = request.form.get("partner_id", type=int)
+    if partner_id:
+        conditions.append(Payment.partner_id == partner_id)
+
+    date_from = parse_date(request.form.get("date_from", ""))
+    date_to = parse_date(request.form.get("date_to", ""))
+    if date_from:
+        conditions.append(Payment.created_at >= date_from)
+    if date_to:
+        conditions.append(Payment.created_at < date_to + timedelta(days=1))
+
+    min_amount = request.form.get("min_amount", "").strip()
+    if min_amount:
+        try:
+            conditions.append(Payment.amount >= Decimal(min_amount))
+        except InvalidOperation:
+            return None, "Invalid minimum amount."
+
+    if len(conditions) == 1:
+        # galti se saare pending payments release na ho jayein
+        return None, "Select payments or set at least one filter."
+    return conditions, None
+
+def release_response(summary, status=200):
+    if wants_json():
+        return jsonify(summary), status
+
+    # ticked rows jo filter se bahar the, unhe saaf batao
+    skipped = summary.get("ticked", 0) - summary.get("count", 0)
+    note = f" {skipped} ticked payments are outside the filters and were left out." if skipped > 0 else ""
+    if "error" in summary:
+        flash(summary["error"], "danger")
+    elif summary["dry_run"]:
+        flash(f"Preview: {summary['count']} payments, total ₹{summary['total']}.{note} Nothing released yet.", "info")
+    else:
+        flash(f"Released {summary['count']} payments, total ₹{summary['total']}.{note}", "success")
+
+    # filters aur ticks wapas page pe, taaki preview ke baad release same selection pe ho
+    args = {f: request.form[f] for f in RELEASE_FILTERS if request.form.get(f)}
+    if "error" in summary or summary["dry_run"]:
+        args["payment_ids"] = request.form.getlist("payment_ids")
+    return redirect(url_for("admin.payments", **args))
+
+@admin_bp.route("/payments/release", methods=["POST"])
+@role_required("admin")
+def release_payments():
+    dry_run = request.form.get("dry_run") == "1"
+    conditions, error = payment_release_conditions()
+    if error:
+        return release_response({"error": error}, 400)
+
+    # preview aur asli release ek hi WHERE se
+    by_partner = (
+        db.session.query(Payment.partner_id, func.count(Payment.id), func.sum(Payment.amount))
+        .filter(*conditions)
+        .group_by(Payment.partner_id)
+        .all()
+    )
+    count = sum(r[1] for r in by_partner)
+    total = sum((Decimal(str(r[2] or 0)) for r in by_partner), Decimal("0.00"))
+    summary = {
+        "dry_run": dry_run,
+        "ticked": len(request.form.getlist("payment_ids", type=int)),
+        "count": count,
+        "total": str(total),
+        "partners": [{"partner_id": r[0], "count": r[1], "total": str(Decimal(str(r[2] or 0)))}
+                     for r in by_partner],
+    }
+    if dry_run or not count:
+        db.session.rollback()
+        return release_response(summary)
+
+    result = db.session.execute(
+        update(Payment)
+        .where(*conditions)
+        .values(released=True, release_date=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != count:
+        # beech me kisi aur ne inme se kuch release kar diye
+        db.session.rollback()
+        return release_response({"error": "Payments changed while releasing, please preview again."}, 409)
+
+    counters.bump(counters.PENDING_PAYMENTS, -count)
+    data_version.bump_many(r[0] for r in by_partner)
+    db.session.commit()
+    return release_response(summary)
 
 
 @admin_bp.route("/create_admin", methods=["GET", "POST"])
@@ -196,21 +522,19 @@ def create_admin():
 @role_required("admin")
 def employees():
     employees = Employee.query.all()
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
     return render_template("employees.html", employees=employees, admin_name=admin_name)
 
 @admin_bp.route("/create_employee", methods=["GET", "POST"])
 @role_required("admin")
 def create_employee():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
     if request.method == "POST":
         name = request.form['name']
         mobile = request.form['mobile']
         password = request.form['password']
 
-        existing_employee = Employee.query.filter_by(mobile=mobile).first()
+        existing_employee = Employee.query.filter_by(mobile_normalized=normalize_mobile(mobile)).first()
         if existing_employee:
             flash("Mobile number already exists!", "danger")
             return redirect(url_for("admin.create_employee"))
@@ -239,8 +563,9 @@ def update_employee_status(employee_id):
         return redirect(url_for("admin.employees"))
 
     employee = Employee.query.get_or_404(employee_id)
-    employee.status = status
+    account_status.set_status(employee, status)
     db.session.commit()
+    account_status.invalidate("employee", employee_id)
 
     flash(f"Employee status updated to {status.upper()}", "success")
     return redirect(url_for("admin.employees"))
@@ -249,15 +574,13 @@ def update_employee_status(employee_id):
 @role_required("admin")
 def courses():
     courses = Course.query.all()
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
     return render_template("courses.html", courses=courses, admin_name=admin_name)
 
 @admin_bp.route("/create_course", methods=["GET", "POST"])
 @role_required("admin")
 def create_course():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
 
     if request.method == "POST":
         title = request.form.get("title")
@@ -298,3 +621,56 @@ def update_course(id):
 
     return redirect(url_for("admin.courses"))
 
+
+@admin_bp.route("/profiler", methods=["GET", "POST"])
+@role_required("admin")
+def profiler_settings():
+    sampler = profiler.current()
+
+    if request.method == "POST":
+        try:
+            rate = float(request.form.get("rate", 0))
+        except ValueError:
+            rate = -1
+        if not 0 <= rate <= 1:
+            flash("Sample rate must be between 0 and 1", "danger")
+            return redirect(url_for("admin.profiler_settings"))
+
+        sampler.save(
+            enabled=request.form.get("enabled") == "on",
+            rate=rate,
+            endpoints=[e for e in request.form.getlist("endpoints") if e in current_app.view_functions],
+            header=request.form.get("header", "").strip(),
+        )
+        flash("Profiler settings saved. Other workers pick them up within a few seconds.", "success")
+        return redirect(url_for("admin.profiler_settings"))
+
+    endpoints = sorted(e for e in current_app.view_functions if e != "static")
+    return render_template("profiler.html", settings=sampler.refresh(), summary=sampler.summary(),
+                           endpoints=endpoints, header_enabled=bool(sampler.header_secret),
+                           admin_name=current_identity().name)
+
+@admin_bp.route("/profiler/reset", methods=["POST"])
+@role_required("admin")
+def profiler_reset():
+    profiler.current().reset()
+    flash("Profiler samples cleared", "success")
+    return redirect(url_for("admin.profiler_settings"))
+
+@admin_bp.route("/profiler/download/<name>")
+@role_required("admin")
+def profiler_download(name):
+    sampler = profiler.current()
+    if name not in sampler.summary():
+        abort(404)
+    stats = sampler.merged(name)
+
+    if request.args.get("format") == "txt":
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(60)
+        return Response(out.getvalue(), mimetype="text/plain")
+
+    # snakeviz / flameprof / gprof2dot seedha ye file padh lete hain
+    return Response(profiler.to_bytes(stats), mimetype="application/octet-stream",
+                    headers={"Content-Disposition": f"attachment; filename={name}.pstats"})
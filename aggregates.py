@@ -0,0 +1,79 @@
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import g, current_app, has_request_context, jsonify
+
+from extensions import db
+from replica import REPLICA
+
+
+class AggregateTimeout(Exception):
+    """An aggregate query did not finish within REPORT_QUERY_TIMEOUT."""
+
+
+def _engine():
+    # @replica_reads wale views ke aggregates bhi replica pe
+    if has_request_context() and g.get("use_replica"):
+        return db.engines[REPLICA]
+    return db.engine
+
+
+def _with_timeout(stmt, engine, timeout):
+    if engine.dialect.name in ("mysql", "mariadb"):
+        # server khud query rok deta hai, thread aur connection atke nahi rehte
+        return stmt.prefix_with(f"/*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */")
+    return stmt
+
+
+def _fetch(engine, stmt):
+    with engine.connect() as conn:
+        return conn.execute(stmt).all()
+
+
+def run_aggregates(queries):
+    """Run independent read-only aggregates; returns {name: [rows]}.
+
+    With REPORT_PARALLEL_QUERIES each query gets its own pooled
+    connection, so the total wait is roughly the slowest query instead
+    of the sum. Raises AggregateTimeout past REPORT_QUERY_TIMEOUT.
+    """
+    config = current_app.config
+    timeout = config["REPORT_QUERY_TIMEOUT"]
+    engine = _engine()
+    statements = {
+        name: _with_timeout(getattr(query, "statement", query), engine, timeout)
+        for name, query in queries.items()
+    }
+
+    if not config["REPORT_PARALLEL_QUERIES"] or len(statements) < 2:
+        return {name: db.session.execute(stmt).all() for name, stmt in statements.items()}
+
+    executor = current_app.extensions["aggregate_pool"]
+    # request context ki copy: SQL instrumentation in queries ko bhi isi request me gine
+    futures = {name: executor.submit(contextvars.copy_context().run, _fetch, engine, stmt)
+               for name, stmt in statements.items()}
+    deadline = time.monotonic() + timeout
+    results = {}
+    try:
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeout:
+                raise AggregateTimeout(name) from None
+    finally:
+        for future in futures.values():
+            future.cancel()
+    return results
+
+
+def aggregate_timeout(e):
+    current_app.logger.warning("Aggregate query timed out: %s", e)
+    return jsonify({"error": "Report is taking too long, please retry"}), 504
+
+
+def init_app(app):
+    app.extensions["aggregate_pool"] = ThreadPoolExecutor(
+        max_workers=app.config["REPORT_QUERY_WORKERS"], thread_name_prefix="aggregate"
+    )
+    app.register_error_handler(AggregateTimeout, aggregate_timeout)
@@ -1,37 +1,60 @@
-from flask import Flask, redirect, url_for
+from flask import Flask, redirect, url_for, flash, request
 from config import Config
 from extensions import db, jwt
+from account_status import is_token_revoked
+import passwords
+import assets
+import compression
+import aggregates
+import sql_stats
+import profiler
+import schema
 
 from admin.routes import admin_bp
 from partner.routes import partner_bp
 from report.routes import report_bp
 from auth.routes import auth_bp
 from employee.routes import employee_bp
+from query_plans import check_query_plans_command
+from counters import rebuild_counters_command
+from datagen import seed_data_command
+from storage import migrate_legacy_documents_command
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if test_config:
+        app.config.update(test_config)
 
     db.init_app(app)
     jwt.init_app(app)
+    passwords.init_app(app)
+    assets.init_app(app)
+    compression.init_app(app)
+    aggregates.init_app(app)
+    sql_stats.init_app(app)
+    profiler.init_app(app)
 
-    with app.app_context():
-        db.create_all()
+    # schema `flask db-upgrade` se banta hai; boot pe sirf version check
+    if not app.config.get("TESTING"):
+        schema.check(app)
 
     @app.context_processor
     def inject_user():
-        from flask_jwt_extended import verify_jwt_in_request, get_jwt
-        try:
-            verify_jwt_in_request(optional=True)
-            claims = get_jwt()
-            return {
-                "current_user": {
-                    "name": claims.get("name"),
-                    "role": claims.get("role")
-                } if claims else None
-            }
-        except Exception as e:
-            return {"current_user": None}
+        from auth.routes import current_identity
+        identity = current_identity()
+        return {
+            "current_user": {
+                "name": identity.name,
+                "role": identity.role
+            } if identity else None
+        }
+
+    @app.errorhandler(413)
+    def too_large(e):
+        mb = app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)
+        flash(f"File too large. Maximum upload size is {mb} MB.", "error")
+        return redirect(request.path)
 
     @jwt.unauthorized_loader
     def unauthorized_callback(reason):
@@ -45,9 +68,15 @@ def create_app():
     def invalid_callback(reason):
         return redirect(url_for("auth.login"))
 
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+
     @jwt.revoked_token_loader
     def revoked_callback(jwt_header, jwt_payload):
-        return redirect(url_for("auth.login"))
+        # blocked/inactive account ya purana token version -> cookie hatao
+        flash("Your account is blocked by Admin", "error")
+        return redirect(url_for("auth.logout"))
     
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(partner_bp, url_prefix="/partner")
@@ -55,6 +84,13 @@ def create_app():
     app.register_blueprint(report_bp, url_prefix="/report")
     app.register_blueprint(employee_bp, url_prefix="/employee")
 
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_counters_command)
+    app.cli.add_command(seed_data_command)
+    app.cli.add_command(migrate_legacy_documents_command)
+    app.cli.add_command(schema.upgrade_command)
+    app.cli.add_command(schema.version_command)
+
     @app.route("/")
     def index():
         return "<h1>Welcome to Admission Partner Portal</h1>"
@@ -63,7 +99,8 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
+    # local dev ke liye; production me deploy step `flask db-upgrade` chalata hai
     with app.app_context():
-        db.create_all()
+        schema.upgrade()
     app.run(debug=True)
 
@@ -0,0 +1,133 @@
+import os
+import json
+import gzip
+import shutil
+import hashlib
+import mimetypes
+
+import click
+from flask import current_app, url_for, request, send_from_directory, abort
+from flask.cli import with_appcontext
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional; sirf gzip variants banenge
+    brotli = None
+
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+SOURCE_DIRS = ("css", "js", "images")
+COMPRESSIBLE = {".css", ".js", ".svg", ".ico", ".json", ".txt"}
+
+# Accept-Encoding preference order -> file suffix
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _dist_root(app):
+    return os.path.join(app.static_folder, DIST_DIR)
+
+
+def build(app):
+    """Copy static sources to dist/ under content-hashed names and
+    precompress the text ones. Returns the manifest."""
+    dist = _dist_root(app)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(app.static_folder, source_dir)):
+            for name in sorted(filenames):
+                src = os.path.join(dirpath, name)
+                logical = os.path.relpath(src, app.static_folder).replace(os.sep, "/")
+
+                with open(src, "rb") as f:
+                    data = f.read()
+
+                base, ext = os.path.splitext(logical)
+                fingerprinted = f"{base}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+                dest = os.path.join(dist, fingerprinted)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as f:
+                    f.write(data)
+
+                if ext.lower() in COMPRESSIBLE:
+                    with open(dest + ".gz", "wb") as f:
+                        # mtime=0 -> same input, same bytes
+                        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                    if brotli:
+                        with open(dest + ".br", "wb") as f:
+                            f.write(brotli.compress(data))
+
+                manifest[logical] = fingerprinted
+
+    with open(os.path.join(dist, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    path = os.path.join(_dist_root(app), MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def asset_url(filename):
+    """Like url_for('static', ...), but to the fingerprinted build when there is one."""
+    fingerprinted = current_app.extensions["assets_manifest"].get(filename)
+    if fingerprinted is None:
+        # build nahi hua (local dev) -> normal static file
+        return url_for("static", filename=filename)
+    return url_for("serve_asset", filename=fingerprinted)
+
+
+def serve_asset(filename):
+    dist = _dist_root(current_app)
+    path = safe_join(dist, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    served, encoding = filename, None
+    for name, suffix in ENCODINGS:
+        if name in request.accept_encodings and os.path.isfile(path + suffix):
+            served, encoding = filename + suffix, name
+            break
+
+    # filename me hash hai, content kabhi nahi badlega
+    resp = send_from_directory(dist, served, max_age=31536000, conditional=True)
+    if encoding:
+        # .gz/.br file ka type nahi, original file ka type
+        resp.headers["Content-Encoding"] = encoding
+        resp.headers["Content-Type"] = _mimetype(filename)
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def _mimetype(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if mimetype.startswith("text/") or mimetype == "application/javascript":
+        mimetype += "; charset=utf-8"
+    return mimetype
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """Fingerprint and precompress static assets into static/dist."""
+    manifest = build(current_app)
+    current_app.extensions["assets_manifest"] = manifest
+    for logical, fingerprinted in sorted(manifest.items()):
+        click.echo(f"{logical} -> {fingerprinted}")
+    if brotli is None:
+        click.echo("brotli not installed, only gzip variants written")
+
+
+def init_app(app):
+    app.extensions["assets_manifest"] = load_manifest(app)
+    app.add_url_rule("/assets/<path:filename>", "serve_asset", serve_asset)
+    app.add_template_global(asset_url)
+    app.cli.add_command(build_assets_command)
@@ -1,20 +1,60 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from models import Admin, Partner, Employee
-from flask_jwt_extended import create_access_token, set_access_cookies, unset_jwt_cookies, verify_jwt_in_request, get_jwt
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g
+from models import Admin, Partner, Employee, normalize_mobile
+from extensions import db
+import passwords
+from flask_jwt_extended import create_access_token, set_access_cookies, unset_jwt_cookies, verify_jwt_in_request, get_jwt, get_jwt_identity
 from datetime import timedelta
 from functools import wraps
 from flask import abort
 
 auth_bp = Blueprint("auth", __name__, template_folder="templates")
 
+TOKEN_EXPIRY = timedelta(hours=8)
+
+
+class Identity:
+    """Logged-in user as carried by the JWT claims (no DB lookup)."""
+
+    def __init__(self, id, role, name):
+        self.id = id
+        self.role = role
+        self.name = name
+
+
+def _identity_from_claims():
+    claims = get_jwt()
+    if not claims:
+        return None
+    return Identity(get_jwt_identity(), claims.get("role"), claims.get("name"))
+
+
+def current_identity():
+    # request me ek hi baar token verify hota hai, phir g se milta hai
+    if "identity" not in g:
+        try:
+            verify_jwt_in_request(optional=True)
+            g.identity = _identity_from_claims()
+        except Exception:
+            g.identity = None
+    return g.identity
+
+
+def issue_token(resp, user, role):
+    access_token = create_access_token(identity=str(user.id),
+        additional_claims={"role": role, "name": user.name, "ver": getattr(user, "token_version", 0) or 0},
+        expires_delta=TOKEN_EXPIRY)
+    set_access_cookies(resp, access_token)
+    return resp
+
+
 def role_required(required_role):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            claims = get_jwt()
+            g.identity = _identity_from_claims()
 
-            if claims.get("role") != required_role:
+            if g.identity.role != required_role:
                 abort(403) 
 
             return fn(*args, **kwargs)
@@ -27,18 +67,40 @@ def login():
         role = request.form['role']
         mobile = request.form['mobile']
         password = request.form['password']
+
+        # normalized: "+91 ..." / "0..." / dashes wale variants ek hi limit share karein
+        limiter_key = (role, normalize_mobile(mobile) or mobile)
+        if passwords.limiter().is_blocked(limiter_key):
+            flash("Too many login attempts. Please try again later.", "danger")
+            return redirect(url_for("auth.login"))
+
         user = None
         if role == "admin":
             user = Admin.query.filter_by(mobile=mobile).first()
         elif role == "partner":
-            user = Partner.query.filter_by(mobile=mobile).first()
+            user = Partner.query.filter_by(mobile_normalized=normalize_mobile(mobile)).first()
         else:
-            user = Employee.query.filter_by(mobile=mobile).first()
+            user = Employee.query.filter_by(mobile_normalized=normalize_mobile(mobile)).first()
+
+        # KDF request thread pe nahi, bounded pool me chalta hai
+        try:
+            valid = bool(user) and passwords.pool().run(
+                passwords.verify_password, user.password_hash, password)
+
+            if valid and passwords.needs_rehash(user.password_hash):
+                user.password_hash = passwords.pool().run(
+                    passwords.hash_password, password, passwords.current_policy())
+                db.session.commit()
+        except passwords.LoginBusy:
+            flash("Server is busy. Please try again in a moment.", "danger")
+            return redirect(url_for("auth.login"))
+
+        if valid:
+            passwords.limiter().reset(limiter_key)
 
-        if user and user.check_password(password):
-            access_token = create_access_token(identity=str(user.id),              
-                additional_claims={"role": role, "name": user.name},
-                expires_delta=timedelta(hours=8))
+            if getattr(user, "status", "active") != "active":
+                flash("Your account is blocked by Admin", "error")
+                return redirect(url_for("auth.login"))
 
             if role == "admin":
                 resp = redirect(url_for("admin.panel"))
@@ -47,9 +109,9 @@ def login():
             else:
                 resp = redirect(url_for("employee.workbench"))
 
-            set_access_cookies(resp, access_token)
-            return resp
+            return issue_token(resp, user, role)
         else:
+            passwords.limiter().record_failure(limiter_key)
             flash("Invalid credentials!", "danger")
             return redirect(url_for("auth.login"))
     return render_template("login.html")
@@ -0,0 +1,124 @@
+"""Login throughput under concurrency.
+
+Seeds a scratch SQLite DB with partners, then fires concurrent logins
+through the Flask test client while a second set of threads keeps
+hitting a cheap page, to show whether the login storm starves it.
+
+    python bench/login_bench.py --users 200 --concurrency 32
+    python bench/login_bench.py --method pbkdf2:sha256:600000 --hash-workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import Partner
+from passwords import hash_password
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def seed_partners(count, policy):
+    # ek hi hash sab pe, warna seeding hi benchmark se lambi ho jaati
+    password_hash = hash_password("secret", policy)
+    db.session.execute(db.insert(Partner), [
+        {"name": f"Partner {i}", "mobile": f"70{i:08d}", "password_hash": password_hash, "status": "active"}
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--method", default="scrypt")
+    parser.add_argument("--hash-workers", type=int, default=2)
+    parser.add_argument("--hash-queue", type=int, default=16)
+    parser.add_argument("--probe-threads", type=int, default=2)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY") or "bench-secret-key-bench-secret-key",
+        "SECRET_KEY": os.getenv("SECRET_KEY") or "bench",
+        "PASSWORD_HASH_METHOD": args.method,
+        "LOGIN_HASH_WORKERS": args.hash_workers,
+        "LOGIN_HASH_QUEUE": args.hash_queue,
+        "LOGIN_MAX_ATTEMPTS": 10**6,
+    })
+
+    try:
+        with app.app_context():
+            db.create_all()
+            seed_partners(args.users, (args.method, app.config["PASSWORD_SALT_LENGTH"]))
+
+        login_times, probe_times = [], []
+        statuses = {"ok": 0, "busy": 0, "failed": 0}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def login(i):
+            client = app.test_client()
+            start = time.perf_counter()
+            resp = client.post("/auth/login", data={
+                "role": "partner", "mobile": f"70{i % args.users:08d}", "password": "secret"})
+            elapsed = time.perf_counter() - start
+            with lock:
+                login_times.append(elapsed)
+                if resp.location and "dashboard" in resp.location:
+                    statuses["ok"] += 1
+                elif "access_token_cookie" not in resp.headers.get("Set-Cookie", ""):
+                    statuses["busy" if resp.location else "failed"] += 1
+
+        def probe():
+            client = app.test_client()
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get("/auth/login")
+                with lock:
+                    probe_times.append(time.perf_counter() - start)
+
+        probes = [threading.Thread(target=probe) for _ in range(args.probe_threads)]
+        for t in probes:
+            t.start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(login, range(args.users)))
+        wall = time.perf_counter() - start
+
+        done.set()
+        for t in probes:
+            t.join()
+
+        print(f"method={args.method} hash_workers={args.hash_workers} "
+              f"hash_queue={args.hash_queue} concurrency={args.concurrency}")
+        print(f"logins: {len(login_times)} in {wall:.2f}s -> {len(login_times) / wall:.1f}/s "
+              f"(ok={statuses['ok']} busy={statuses['busy']} failed={statuses['failed']})")
+        for name, values in (("login", login_times), ("other page", probe_times)):
+            print(f"{name:<11} p50={percentile(values, 50) * 1000:7.1f}ms "
+                  f"p95={percentile(values, 95) * 1000:7.1f}ms "
+                  f"p99={percentile(values, 99) * 1000:7.1f}ms n={len(values)}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Latency and SQL query counts for the hot routes at several data sizes.
+
+For each --leads size a scratch SQLite DB is migrated and filled by
+datagen.generate(), then every route below is requested --requests
+times through the Flask test client (responses fully read, so streamed
+pages are timed end to end).
+
+    python bench/route_bench.py
+    python bench/route_bench.py --leads 1000,100000 --requests 50
+    python bench/route_bench.py --only admin.leads,partner.dashboard
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select
+
+from app import create_app
+from extensions import db
+from models import Admin, Partner, Employee
+import datagen
+import schema
+
+# (name, role, url) -- url me {partner_id} busiest partner se bharta hai
+ROUTES = [
+    ("admin.panel", "admin", "/admin/panel"),
+    ("admin.leads", "admin", "/admin/leads"),
+    ("admin.leads?status", "admin", "/admin/leads?status=Converted"),
+    ("admin.leads?partner", "admin", "/admin/leads?partner_id={partner_id}"),
+    ("admin.partners", "admin", "/admin/partners"),
+    ("admin.payments", "admin", "/admin/payments"),
+    ("employee.workbench", "employee", "/employee/workbench"),
+    ("employee.leads_api", "employee", "/employee/api/leads"),
+    ("partner.dashboard", "partner", "/partner/dashboard"),
+    ("partner.payments_api", "partner", "/partner/api/payment"),
+    ("report.admin_reports_api", "admin", "/report/admin/api/reports"),
+    ("report.admin_reports_api?by", "admin", "/report/admin/api/reports?by=partner"),
+    ("report.partner_reports_api", "partner", "/report/partner/api/reports"),
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_client(app, role, user):
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity=str(user.id), additional_claims={
+            "role": role, "name": user.name, "ver": getattr(user, "token_version", 0) or 0})
+    client.set_cookie("access_token_cookie", token)
+    return client
+
+
+def bench_size(leads, args):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY") or "bench-secret-key-bench-secret-key",
+        "SECRET_KEY": os.getenv("SECRET_KEY") or "bench",
+        "JWT_COOKIE_SECURE": False,
+    })
+
+    try:
+        with app.app_context():
+            schema.upgrade(echo=lambda msg: None)
+            start = time.perf_counter()
+            datagen.generate(leads=leads, partners=args.partners, employees=args.employees)
+            seeded = time.perf_counter() - start
+
+            # partner dashboard ka worst case: sabse zyada leads wala partner
+            from models import Lead
+            partner_id = db.session.execute(
+                select(Lead.partner_id).group_by(Lead.partner_id)
+                .order_by(db.func.count().desc()).limit(1)
+            ).scalar()
+            clients = {
+                "admin": make_client(app, "admin", db.session.scalars(select(Admin).limit(1)).one()),
+                "employee": make_client(app, "employee", db.session.scalars(select(Employee).limit(1)).one()),
+                "partner": make_client(app, "partner", db.session.get(Partner, partner_id)),
+            }
+
+            statements = []
+            listener = lambda *a: statements.append(1)
+            event.listen(db.engine, "before_cursor_execute", listener)
+
+        print(f"\n== {leads:,} leads (seeded in {seeded:.1f}s) ==")
+        print(f"{'route':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'KB':>8}")
+
+        for name, role, url in ROUTES:
+            if args.only and name.split("?")[0] not in args.only:
+                continue
+            url = url.format(partner_id=partner_id)
+            client = clients[role]
+
+            resp = client.get(url)  # warm-up: template compile, caches
+            resp.get_data()
+            resp.close()
+            if resp.status_code != 200:
+                print(f"{name:<30} HTTP {resp.status_code}")
+                continue
+
+            times, queries = [], []
+            size = 0
+            for _ in range(args.requests):
+                del statements[:]
+                start = time.perf_counter()
+                resp = client.get(url)
+                size = len(resp.get_data())
+                resp.close()
+                times.append(time.perf_counter() - start)
+                queries.append(len(statements))
+
+            print(f"{name:<30} {percentile(times, 50) * 1000:9.1f} {percentile(times, 95) * 1000:9.1f} "
+                  f"{percentile(times, 99) * 1000:9.1f} {max(queries):8d} {size / 1024:8.1f}")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leads", default="1000,100000,1000000",
+                        help="Comma separated data sizes.")
+    parser.add_argument("--partners", type=int, default=200)
+    parser.add_argument("--employees", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=30, help="Timed requests per route.")
+    parser.add_argument("--only", default="", help="Comma separated route names.")
+    args = parser.parse_args()
+    args.only = {name for name in args.only.split(",") if name}
+
+    for leads in (int(n) for n in args.leads.split(",")):
+        bench_size(leads, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import gzip
+import zlib
+
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # optional; tab sirf gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = {"text/html", "application/json"}
+
+# streamed response me itna jama karke ek compressed chunk bhejte hain
+STREAM_FLUSH_BYTES = 16 * 1024
+
+
+def _choose_encoding(allow_br):
+    if allow_br and brotli and "br" in request.accept_encodings:
+        return "br"
+    if "gzip" in request.accept_encodings:
+        return "gzip"
+    return None
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip header
+    pending = []
+    size = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_FLUSH_BYTES:
+                # sync flush: browser ko abhi tak ka HTML turant mil jaata hai
+                yield compressor.compress(b"".join(pending)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                pending, size = [], 0
+        yield compressor.compress(b"".join(pending)) + compressor.flush()
+    finally:
+        # client beech me disconnect ho to andar wala stream (aur uska context) bhi band
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def compress_response(response):
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.mimetype not in COMPRESSIBLE_TYPES
+        or "Content-Encoding" in response.headers
+        or response.direct_passthrough
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    if response.is_streamed:
+        encoding = _choose_encoding(allow_br=False)
+        if not encoding:
+            return response
+        response.response = gzip_stream(response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        encoding = _choose_encoding(allow_br=True)
+        if not encoding:
+            return response
+        if encoding == "br":
+            response.set_data(brotli.compress(data, quality=5))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=6))
+
+    response.headers["Content-Encoding"] = encoding
+    # gzip aur plain body ek hi strong ETag share nahi kar sakte
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    if app.config["COMPRESS_RESPONSES"]:
+        app.after_request(compress_response)
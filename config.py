@@ -7,6 +7,10 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # read replica optional hai; na ho to sab primary pe
+    SQLALCHEMY_BINDS = {"replica": os.getenv("REPLICA_DATABASE_URL")} if os.getenv("REPLICA_DATABASE_URL") else {}
+    REPLICA_MAX_LAG = int(os.getenv("REPLICA_MAX_LAG", 5))
+    REPLICA_CHECK_INTERVAL = int(os.getenv("REPLICA_CHECK_INTERVAL", 10))
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_TOKEN_LOCATION = ["cookies"]
     JWT_ACCESS_COOKIE_PATH = "/"
@@ -14,5 +18,53 @@ class Config:
     JWT_COOKIE_SAMESITE = "Lax"      # VERY IMPORTANT
     JWT_COOKIE_CSRF_PROTECT = False
 
+    LEADS_PAGE_SIZE = int(os.getenv("LEADS_PAGE_SIZE", 50))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 2000))
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+    IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", 5000))
+
+    # KYC / bank proof uploads, static folder ke bahar
+    UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads"))
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+
+    # HTML/JSON gzip (brotli agar installed); proxy already compress kare to band karo
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    STREAM_BUFFER_EVENTS = int(os.getenv("STREAM_BUFFER_EVENTS", 40))
+
+    # report aggregates alag connections pe ek saath; workers x gunicorn workers <= DB pool
+    REPORT_PARALLEL_QUERIES = os.getenv("REPORT_PARALLEL_QUERIES", "1") == "1"
+    REPORT_QUERY_WORKERS = int(os.getenv("REPORT_QUERY_WORKERS", 4))
+    REPORT_QUERY_TIMEOUT = float(os.getenv("REPORT_QUERY_TIMEOUT", 10))
+
+    # per-request SQL count/time (Server-Timing header), slow query + N+1 warnings
+    SQL_INSTRUMENT = os.getenv("SQL_INSTRUMENT", "0") == "1"
+    SQL_SLOW_MS = int(os.getenv("SQL_SLOW_MS", 200))
+    SQL_REPEAT_WARN = int(os.getenv("SQL_REPEAT_WARN", 10))
+
+    # /admin/profiler; settings aur samples yahan, saare workers share karte hain
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+    PROFILER_CHECK_INTERVAL = int(os.getenv("PROFILER_CHECK_INTERVAL", 5))
+    PROFILER_FLUSH_INTERVAL = int(os.getenv("PROFILER_FLUSH_INTERVAL", 30))
+    # header se force-profile sirf jab value ye secret ho; khaali = header band
+    PROFILER_HEADER_SECRET = os.getenv("PROFILER_HEADER_SECRET")
+
+    # har worker apna cache rakhta hai; dusre workers max itne seconds stale
+    ACCOUNT_STATUS_CACHE_TTL = int(os.getenv("ACCOUNT_STATUS_CACHE_TTL", 30))
+
+    # werkzeug method string, e.g. "scrypt:32768:8:1" ya "pbkdf2:sha256:600000"
+    # policy badalne par purane hashes agle successful login pe rehash hote hain
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+
+    # per worker process: kitne hash parallel, kitne wait kar sakte hain
+    LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", 2))
+    LOGIN_HASH_QUEUE = int(os.getenv("LOGIN_HASH_QUEUE", 16))
+    LOGIN_HASH_WAIT = float(os.getenv("LOGIN_HASH_WAIT", 2))
+    LOGIN_MAX_ATTEMPTS = int(os.getenv("LOGIN_MAX_ATTEMPTS", 5))
+    # itne se zyada mobiles track hon to sabse purane chhod diye jaate hain
+    LOGIN_LIMITER_MAX_KEYS = int(os.getenv("LOGIN_LIMITER_MAX_KEYS", 100000))
+    LOGIN_ATTEMPT_WINDOW = int(os.getenv("LOGIN_ATTEMPT_WINDOW", 300))
+
 
 
@@ -0,0 +1,70 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import update, select, func
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import DashboardCounter, Partner, Lead, Payment
+from aggregates import run_aggregates
+
+PARTNERS = "partners"
+LEADS = "leads"
+CONVERTED_LEADS = "converted_leads"
+PENDING_PAYMENTS = "pending_payments"
+
+# source of truth for each counter, used by rebuild and for missing rows
+COUNTER_QUERIES = {
+    PARTNERS: select(func.count(Partner.id)),
+    LEADS: select(func.count(Lead.id)),
+    CONVERTED_LEADS: select(func.count(Lead.id)).where(Lead.status == "Converted"),
+    PENDING_PAYMENTS: select(func.count(Payment.id)).where(Payment.released == False),
+}
+
+
+def bump(name, delta=1):
+    """Add `delta` to a counter inside the caller's transaction.
+
+    Call it after the row change is added to the session and before
+    commit, so the counter and the data commit (or roll back) together.
+    """
+    result = db.session.execute(
+        update(DashboardCounter)
+        .where(DashboardCounter.name == name)
+        .values(value=DashboardCounter.value + delta)
+    )
+    if result.rowcount:
+        return
+    # counter abhi bana nahi; autoflush ke baad COUNT me naya change already hai.
+    # do writers saath insert karein to savepoint se haarne wala UPDATE pe retry karta hai
+    try:
+        with db.session.begin_nested():
+            db.session.add(DashboardCounter(name=name, value=db.session.scalar(COUNTER_QUERIES[name])))
+    except IntegrityError:
+        bump(name, delta)
+
+
+def read_all():
+    values = {c.name: c.value for c in DashboardCounter.query.all()}
+    # jo counter row abhi nahi bani, uske COUNTs ek saath
+    missing = {name: q for name, q in COUNTER_QUERIES.items() if name not in values}
+    if missing:
+        for name, rows in run_aggregates(missing).items():
+            values[name] = rows[0][0]
+    return values
+
+
+def rebuild():
+    values = {}
+    for name, query in COUNTER_QUERIES.items():
+        values[name] = db.session.scalar(query)
+        db.session.merge(DashboardCounter(name=name, value=values[name]))
+    db.session.commit()
+    return values
+
+
+@click.command("rebuild-counters")
+@with_appcontext
+def rebuild_counters_command():
+    """Recompute the admin panel counters from the source tables."""
+    for name, value in rebuild().items():
+        click.echo(f"{name:<20} {value}")
@@ -0,0 +1,74 @@
+import hashlib
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import DataVersion
+
+GLOBAL = "global"
+
+
+def partner_scope(partner_id):
+    return f"partner:{partner_id}"
+
+
+def _bump(scope):
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.scope == scope)
+        .values(version=DataVersion.version + 1)
+    )
+    if result.rowcount:
+        return
+    # pehli baar; do workers saath insert karein to savepoint se bach jaata hai
+    try:
+        with db.session.begin_nested():
+            db.session.add(DataVersion(scope=scope, version=1))
+    except IntegrityError:
+        _bump(scope)
+
+
+def bump(partner_id=None):
+    """Mark report data as changed, inside the caller's transaction."""
+    _bump(GLOBAL)
+    if partner_id is not None:
+        _bump(partner_scope(partner_id))
+
+
+def bump_many(partner_ids):
+    """bump() for a batch touching several partners: one global bump."""
+    _bump(GLOBAL)
+    # sorted: do batches ek hi order me rows lock karein, deadlock na ho
+    for partner_id in sorted({p for p in partner_ids if p is not None}):
+        _bump(partner_scope(partner_id))
+
+
+def get_version(scope):
+    return db.session.query(DataVersion.version).filter_by(scope=scope).scalar() or 0
+
+
+def versioned(scope_fn):
+    """Weak ETag from the scope's version (the body may be sent gzipped or
+    plain); If-None-Match hits return 304 before the view (and its
+    aggregate queries) runs."""
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            scope = scope_fn()
+            raw = f"{request.endpoint}|{request.query_string.decode()}|{scope}|{get_version(scope)}"
+            etag = hashlib.sha1(raw.encode()).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(fn(*args, **kwargs))
+
+            resp.set_etag(etag, weak=True)
+            # browser har baar revalidate kare, body sirf change par
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return decorator
+    return wrapper
@@ -0,0 +1,174 @@
+"""Bulk data generator for benchmarks and local load testing.
+
+    flask seed-data --leads 100000 --partners 500
+
+Rows go in through Core executemany batches with explicit ids, so a
+million leads take minutes rather than hours. Deterministic for a given
+--seed.
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Admin, Partner, Employee, Course, Lead, Payment
+from passwords import hash_password
+import counters
+import ledger
+
+PASSWORD = "secret"
+
+# production jaisa mix: zyada leads pending/in-process, kam convert hote hain
+STATUS_WEIGHTS = {"Pending": 35, "In-Process": 25, "Converted": 15, "Not Converted": 25}
+PAYMENT_TERMS = ["Cash", "Online", "Online", "Other"]
+RELEASED_SHARE = 0.6
+
+COURSE_PRICES = [Decimal("15000"), Decimal("25000"), Decimal("40000"), Decimal("60000"), Decimal("90000")]
+
+REMARKS = [
+    "Called, asked to call back in the evening",
+    "Interested, wants fee structure on WhatsApp",
+    "Parents will decide next week",
+    "Not reachable, phone switched off",
+    "Visited centre, documents pending",
+    "Fee too high, looking at other options",
+    "Admission done, fees paid",
+    "Wrong number",
+]
+FIRST_NAMES = ["Aarav", "Priya", "Rohit", "Sneha", "Vikram", "Anjali", "Karan", "Neha", "Arjun", "Pooja"]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Singh", "Yadav", "Jain", "Patel", "Kumar"]
+
+
+def _next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert(model, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(db.insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(model), batch)
+
+
+def generate(leads=1000, partners=50, employees=5, courses=10, days=365,
+             seed=42, batch_size=5000):
+    """Insert a realistic data set and rebuild the dashboard counters.
+
+    Returns {table: rows inserted}. Every account gets the password
+    "secret"; mobiles are 70/60/9 prefixed so they never clash with
+    real-looking test data.
+    """
+    rnd = random.Random(seed)
+    password_hash = hash_password(PASSWORD)
+    end = datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    created = {}
+
+    if not db.session.scalar(select(func.count(Admin.id))):
+        db.session.add(Admin(name="Bench Admin", mobile="5000000000", email="admin@example.com",
+                             password_hash=password_hash))
+        created["admin"] = 1
+
+    first_partner = _next_id(Partner)
+    _insert(Partner, (
+        {"id": first_partner + i, "name": f"Partner {i}", "mobile": f"70{first_partner + i:08d}",
+         "password_hash": password_hash, "shop_name": f"Shop {i}", "status": "active"}
+        for i in range(partners)
+    ), batch_size)
+    created["partner"] = partners
+
+    first_employee = _next_id(Employee)
+    _insert(Employee, (
+        {"id": first_employee + i, "name": f"Employee {i}", "mobile": f"60{first_employee + i:08d}",
+         "password_hash": password_hash, "status": "active"}
+        for i in range(employees)
+    ), batch_size)
+    created["employee"] = employees
+
+    first_course = _next_id(Course)
+    prices = {}
+    course_rows = []
+    for i in range(courses):
+        price = rnd.choice(COURSE_PRICES)
+        prices[first_course + i] = price
+        course_rows.append({"id": first_course + i, "title": f"Course {i}", "description": "-",
+                            "price": price, "discount": Decimal("0.00"), "real_price": price,
+                            "status": "active", "created_at": start})
+    _insert(Course, course_rows, batch_size)
+    created["courses"] = courses
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    step = (end - start) / max(leads, 1)
+    first_lead = _next_id(Lead)
+    payments = []
+
+    def lead_rows():
+        for i in range(leads):
+            lead_id = first_lead + i
+            partner_id = first_partner + rnd.randrange(partners)
+            status = rnd.choices(statuses, weights)[0]
+            created_at = start + step * i
+            row = {"id": lead_id, "student_name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                   "mobile": f"9{lead_id:09d}", "partner_id": partner_id, "status": status,
+                   "created_at": created_at, "course_id": None, "payment_term": None,
+                   "remark": None, "remark_updated_at": None}
+
+            if status != "Pending" and rnd.random() < 0.7:
+                row["remark"] = rnd.choice(REMARKS)
+                row["remark_updated_at"] = created_at + timedelta(hours=rnd.randint(1, 72))
+
+            if status == "Converted":
+                course_id = first_course + rnd.randrange(courses)
+                row["course_id"] = course_id
+                row["payment_term"] = rnd.choice(PAYMENT_TERMS)
+                released = rnd.random() < RELEASED_SHARE
+                payments.append({
+                    "partner_id": partner_id, "lead_id": lead_id,
+                    "amount": ledger.commission_amount(prices[course_id]),
+                    "idempotency_key": ledger.commission_key(lead_id),
+                    "created_at": created_at,
+                    "released": released,
+                    "release_date": created_at + timedelta(days=rnd.randint(7, 30)) if released else None,
+                })
+            yield row
+
+    _insert(Lead, lead_rows(), batch_size)
+    created["leads"] = leads
+
+    _insert(Payment, payments, batch_size)
+    created["payment"] = len(payments)
+
+    db.session.commit()
+    counters.rebuild()
+
+    if db.engine.dialect.name == "sqlite":
+        # planner stats, warna badi table pe bhi SCAN chun sakta hai
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    return created
+
+
+@click.command("seed-data")
+@click.option("--leads", default=1000, show_default=True)
+@click.option("--partners", default=50, show_default=True)
+@click.option("--employees", default=5, show_default=True)
+@click.option("--courses", default=10, show_default=True)
+@click.option("--days", default=365, show_default=True, help="Spread lead created_at over this many days.")
+@click.option("--seed", default=42, show_default=True)
+@with_appcontext
+def seed_data_command(leads, partners, employees, courses, days, seed):
+    """Fill the database with generated partners, leads and payments."""
+    created = generate(leads=leads, partners=partners, employees=employees,
+                       courses=courses, days=days, seed=seed)
+    for table, count in created.items():
+        click.echo(f"{table:<10} {count}")
+    click.echo(f"All generated accounts use the password '{PASSWORD}'.")
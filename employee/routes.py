@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, request, redirect, url_for, flash, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity
 from models import Lead, Employee
 from extensions import db
-from auth.routes import role_required
+from auth.routes import role_required, issue_token
 from datetime import datetime
+from pagination import keyset_page, parse_date, selective
+from streaming import stream_page
 import pytz
 
 employee_bp = Blueprint("employee", __name__, template_folder="templates/employee")
@@ -21,41 +23,88 @@ def workbench():
     employee_id = get_jwt_identity()
     employee = Employee.query.get_or_404(employee_id)
 
-    if employee.status != "active":
-        flash("Your account is blocked by Admin", "error")
-        return redirect(url_for("auth.logout"))
-
     # Profile update only
     if request.method == "POST" and request.form.get("type") == "profile":
         employee.name = request.form.get("name")
         employee.email = request.form.get("email")
         db.session.commit()
         flash("Profile updated successfully", "success")
-        return redirect(url_for("employee.workbench"))
+        # naam JWT claim me hai, isliye naya token
+        return issue_token(redirect(url_for("employee.workbench")), employee, "employee")
+
+    # leads table ab /employee/api/leads se page-by-page load hoti hai
+    return stream_page("workbench.html", employee=employee)
+
+
+MAX_FEED_PAGE_SIZE = 200
+
+def wants_json():
+    best = request.accept_mimetypes.best_match(["text/html", "application/json"])
+    return best == "application/json"
+
+def lead_to_dict(l):
+    updated_ist = utc_to_ist(l.remark_updated_at)
+    return {
+        "id": l.id,
+        "student_name": l.student_name,
+        "mobile": l.mobile,
+        "email": l.email,
+        "current_status": l.current_status,
+        "status": l.status,
+        "created_at": l.created_at.strftime("%d %b %Y") if l.created_at else None,
+        "remark": l.remark,
+        "remark_updated_at": updated_ist.strftime("%d %b %Y %I:%M %p") if updated_ist else None
+    }
+
+@employee_bp.route("/api/leads")
+@role_required("employee")
+def leads_api():
+    page_size = request.args.get("page_size", current_app.config["LEADS_PAGE_SIZE"], type=int)
+    page_size = max(1, min(page_size, MAX_FEED_PAGE_SIZE))
+
+    query = Lead.query
+
+    status = request.args.get("status")
+    if status:
+        query = query.filter(Lead.status == status)
+
+    if request.args.get("no_remark") in ("1", "true"):
+        query = query.filter(Lead.remark_updated_at.is_(None))
 
-    leads = Lead.query.all()
+    # ISO datetime ya "YYYY-MM-DD", UTC me (DB me UTC save hota hai)
+    remark_since = request.args.get("remark_since")
+    if remark_since:
+        try:
+            since = datetime.fromisoformat(remark_since)
+        except ValueError:
+            since = parse_date(remark_since)
+        if since is None:
+            return jsonify({"error": "Invalid remark_since"}), 400
+        # "since" polling me chhoti range hoti hai: ix_leads_remark_updated_at se padho
+        query = query.filter(selective(Lead.remark_updated_at >= since, db.engine.dialect.name))
 
-    for l in leads:
-        l.remark_updated_at_ist = utc_to_ist(l.remark_updated_at)
+    leads, next_cursor = keyset_page(
+        query, Lead.created_at, Lead.id,
+        request.args.get("cursor"),
+        page_size
+    )
 
-    return render_template("workbench.html", employee=employee, leads=leads)
+    return jsonify({
+        "leads": [lead_to_dict(l) for l in leads],
+        "next_cursor": next_cursor
+    })
 
 
 
 @employee_bp.route("/add-remark", methods=["POST"])
 @role_required("employee")
 def add_remark():
-    employee_id = get_jwt_identity()
-    employee = Employee.query.get_or_404(employee_id)
-
-    if employee.status != "active":
-        flash("Your account is blocked by Admin", "error")
-        return redirect(url_for("auth.logout"))
-
     lead_id = request.form.get("lead_id")
     remark = request.form.get("remark")
 
     if not lead_id or not remark:
+        if wants_json():
+            return jsonify({"error": "Remark is required"}), 400
         flash("Remark is required", "error")
         return redirect(url_for("employee.workbench"))
 
@@ -65,5 +114,9 @@ def add_remark():
     lead.remark_updated_at = datetime.utcnow()  # UTC save
     db.session.commit()
 
+    # workbench fetch se save karta hai, sirf updated row wapas bhejo
+    if wants_json():
+        return jsonify(lead_to_dict(lead))
+
     flash("Remark saved successfully", "success")
     return redirect(url_for("employee.workbench"))
@@ -0,0 +1,88 @@
+"""Commission ledger: one Payment row per converted lead.
+
+The entry is written by the same transaction that converts the lead,
+so dashboards and reports just SUM payment.amount.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Lead, Payment, Course
+import counters
+
+COMMISSION_RATE = Decimal("0.25")
+CENTS = Decimal("0.01")
+
+
+def commission_key(lead_id):
+    # ek lead = ek entry; retry / double submit dusri row nahi banata
+    return f"commission:lead:{lead_id}"
+
+
+def commission_amount(price):
+    return (Decimal(price) * COMMISSION_RATE).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def record_commissions(lead_ids):
+    """Create or correct commission entries for many leads, set-based, in
+    the caller's transaction.
+
+    Leads that are not Converted with a course are skipped. Released
+    entries are never changed. Returns the number of entries created.
+    """
+    # autoflush: caller ke pending status/course changes yahan dikh jaate hain
+    leads = (
+        db.session.query(Lead.id, Lead.partner_id, Course.price)
+        .join(Course, Course.id == Lead.course_id)
+        .filter(Lead.id.in_(lead_ids), Lead.status == "Converted")
+        .all()
+    )
+    if not leads:
+        return 0
+
+    existing = {
+        p.idempotency_key: p
+        for p in db.session.query(Payment.id, Payment.idempotency_key, Payment.released, Payment.amount)
+        .filter(Payment.idempotency_key.in_([commission_key(l.id) for l in leads]))
+    }
+
+    new_entries, corrections = [], []
+    for lead_id, partner_id, price in leads:
+        amount = commission_amount(price)
+        entry = existing.get(commission_key(lead_id))
+        if entry is None:
+            new_entries.append({"partner_id": partner_id, "lead_id": lead_id, "amount": amount,
+                                "released": False, "idempotency_key": commission_key(lead_id)})
+        elif not entry.released and entry.amount != amount:
+            # course badla aur payment abhi release nahi hua
+            corrections.append({"id": entry.id, "amount": amount})
+
+    if corrections:
+        db.session.execute(update(Payment), corrections)
+
+    created = 0
+    if new_entries:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Payment), new_entries)
+            created = len(new_entries)
+        except IntegrityError:
+            # dusri request ne inme se kuch entries abhi likhi; baaki ek ek karke
+            for row in new_entries:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(Payment), [row])
+                    created += 1
+                except IntegrityError:
+                    pass
+
+    if created:
+        counters.bump(counters.PENDING_PAYMENTS, created)
+    return created
+
+
+def record_commission(lead):
+    """Single-lead record_commissions(), for admin.update_lead."""
+    return record_commissions([lead.id])
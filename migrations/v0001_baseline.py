@@ -0,0 +1,11 @@
+"""Create every table that does not exist yet.
+
+On a fresh database this builds the full current schema; on a database
+made by the old create_all() boot it only adds the new tables.
+"""
+from extensions import db
+import models  # noqa: F401  (tables register on db.metadata)
+
+
+def upgrade(conn):
+    db.metadata.create_all(conn, checkfirst=True)
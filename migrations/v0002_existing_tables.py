@@ -0,0 +1,85 @@
+"""Columns and indexes added after the create_all() era.
+
+create_all() never alters existing tables, so databases created before
+the versioning switch are missing these. Every step checks the current
+state first (missing column, rows still without mobile_normalized,
+missing index), so a run that failed half way on MySQL, where DDL
+commits implicitly, can simply be re-run. On a database built by v0001
+it is a no-op.
+"""
+from sqlalchemy import inspect, text
+
+from models import normalize_mobile
+
+NEW_COLUMNS = [
+    ("partner", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("employee", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("partner", "mobile_normalized", "VARCHAR(20)"),
+    ("employee", "mobile_normalized", "VARCHAR(20)"),
+    ("leads", "mobile_normalized", "VARCHAR(20)"),
+]
+
+NEW_INDEXES = [
+    ("leads", "ix_leads_created_id", "created_at, id", False),
+    ("leads", "ix_leads_status_created_id", "status, created_at, id", False),
+    ("leads", "ix_leads_partner_created_id", "partner_id, created_at, id", False),
+    ("leads", "ix_leads_partner_status", "partner_id, status", False),
+    ("leads", "ix_leads_course_created_id", "course_id, created_at, id", False),
+    ("leads", "ix_leads_remark_updated_at", "remark_updated_at", False),
+    # v0003 isse covering index se badal deta hai
+    ("payment", "ix_payment_partner_released", "partner_id, released", False),
+    ("payment", "ix_payment_released_amount", "released, amount", False),
+    ("payment", "ix_payment_lead", "lead_id", False),
+    ("partner", "ix_partner_mobile_normalized", "mobile_normalized", True),
+    ("employee", "ix_employee_mobile_normalized", "mobile_normalized", True),
+    ("leads", "ix_leads_mobile_normalized", "mobile_normalized", True),
+]
+
+BATCH = 1000
+
+
+MOBILE_TABLES = ["partner", "employee", "leads"]
+
+
+def backfill_mobiles(conn, table):
+    rows = conn.execute(text(
+        f"SELECT id, mobile FROM {table} WHERE mobile_normalized IS NULL"
+    )).fetchall()
+    if not rows:
+        return
+
+    # pichle adhoore run ya nayi app ke likhe rows se bhi takraav na ho
+    seen = dict(conn.execute(text(
+        f"SELECT mobile_normalized, id FROM {table} WHERE mobile_normalized IS NOT NULL"
+    )).fetchall())
+    updates = []
+    for row_id, mobile in rows:
+        normalized = normalize_mobile(mobile)
+        if normalized in seen:
+            raise RuntimeError(
+                f"{table}: ids {seen[normalized]} and {row_id} share mobile {normalized}; "
+                "merge or fix them before upgrading"
+            )
+        seen[normalized] = row_id
+        updates.append({"id": row_id, "m": normalized})
+
+    for i in range(0, len(updates), BATCH):
+        conn.execute(text(f"UPDATE {table} SET mobile_normalized = :m WHERE id = :id"),
+                     updates[i:i + BATCH])
+
+
+def upgrade(conn):
+    insp = inspect(conn)
+
+    for table, column, ddl in NEW_COLUMNS:
+        if column not in {c["name"] for c in insp.get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+    # column pehle se ho tab bhi: duplicate fix karke dobara chalane par NULL rows bhar jaayein
+    for table in MOBILE_TABLES:
+        backfill_mobiles(conn, table)
+
+    for table, name, columns, unique in NEW_INDEXES:
+        if name not in {i["name"] for i in inspect(conn).get_indexes(table)}:
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            conn.execute(text(f"CREATE {kind} {name} ON {table} ({columns})"))
@@ -0,0 +1,81 @@
+"""Payment becomes the commission ledger.
+
+amount moves to an exact DECIMAL, entries get an idempotency key (one per
+lead), and converted leads that never got a Payment row are backfilled.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import inspect, text, bindparam, Numeric
+
+# frozen copy: baad me rate badle to bhi ye migration wahi kare jo aaj karti hai
+COMMISSION_RATE = Decimal("0.25")
+BATCH = 1000
+
+
+def _key(lead_id):
+    return f"commission:lead:{lead_id}"
+
+
+def upgrade(conn):
+    dialect = conn.dialect.name
+    columns = {c["name"] for c in inspect(conn).get_columns("payment")}
+
+    if "idempotency_key" not in columns:
+        conn.execute(text("ALTER TABLE payment ADD COLUMN idempotency_key VARCHAR(64)"))
+    if "created_at" not in columns:
+        conn.execute(text("ALTER TABLE payment ADD COLUMN created_at DATETIME"))
+    if dialect in ("mysql", "mariadb"):
+        # SQLite me column type sirf affinity hai, wahan kuch badalna nahi
+        conn.execute(text("ALTER TABLE payment MODIFY amount DECIMAL(12, 2) DEFAULT 0"))
+
+    # purane rows: har lead ki pehli payment ko key milti hai
+    rows = conn.execute(text(
+        "SELECT id, lead_id FROM payment WHERE idempotency_key IS NULL AND lead_id IS NOT NULL ORDER BY id"
+    )).fetchall()
+    taken = {r[0] for r in conn.execute(text(
+        "SELECT lead_id FROM payment WHERE idempotency_key IS NOT NULL AND lead_id IS NOT NULL"))}
+    updates = []
+    for payment_id, lead_id in rows:
+        if lead_id not in taken:
+            taken.add(lead_id)
+            updates.append({"id": payment_id, "k": _key(lead_id)})
+    for i in range(0, len(updates), BATCH):
+        conn.execute(text("UPDATE payment SET idempotency_key = :k WHERE id = :id"), updates[i:i + BATCH])
+
+    # converted leads jinki entry kabhi bani hi nahi
+    missing = conn.execute(text(
+        "SELECT leads.id, leads.partner_id, courses.price FROM leads "
+        "JOIN courses ON courses.id = leads.course_id "
+        "LEFT JOIN payment ON payment.lead_id = leads.id "
+        "WHERE leads.status = 'Converted' AND payment.id IS NULL"
+    )).fetchall()
+    inserts = [
+        {"partner_id": partner_id, "lead_id": lead_id, "k": _key(lead_id),
+         "amount": (Decimal(str(price)) * COMMISSION_RATE).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)}
+        for lead_id, partner_id, price in missing
+    ]
+    for i in range(0, len(inserts), BATCH):
+        conn.execute(text(
+            "INSERT INTO payment (partner_id, lead_id, amount, released, idempotency_key) "
+            "VALUES (:partner_id, :lead_id, :amount, 0, :k)"
+        ).bindparams(bindparam("amount", type_=Numeric(12, 2))), inserts[i:i + BATCH])
+
+    indexes = {i["name"] for i in inspect(conn).get_indexes("payment")}
+    if "ix_payment_idempotency_key" not in indexes:
+        conn.execute(text("CREATE UNIQUE INDEX ix_payment_idempotency_key ON payment (idempotency_key)"))
+    if "ix_payment_partner_released_amount" not in indexes:
+        conn.execute(text(
+            "CREATE INDEX ix_payment_partner_released_amount ON payment (partner_id, released, amount)"))
+    if "ix_payment_partner_released" in indexes:
+        # naya index partner_id se shuru hota hai, FK ka index wahi ban jaata hai
+        if dialect in ("mysql", "mariadb"):
+            conn.execute(text("DROP INDEX ix_payment_partner_released ON payment"))
+        else:
+            conn.execute(text("DROP INDEX ix_payment_partner_released"))
+
+    if inserts:
+        conn.execute(text(
+            "UPDATE dashboard_counters SET value = "
+            "(SELECT COUNT(*) FROM payment WHERE released = 0) WHERE name = 'pending_payments'"))
+        # report ETags purane sums pe atke na rahen
+        conn.execute(text("UPDATE data_versions SET version = version + 1"))
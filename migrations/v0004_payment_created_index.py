@@ -0,0 +1,17 @@
+"""Bulk release filters pending payments by conversion date.
+
+Entries written before payment.created_at existed take the lead's
+created_at, the closest date we have.
+"""
+from sqlalchemy import inspect, text
+
+
+def upgrade(conn):
+    conn.execute(text(
+        "UPDATE payment SET created_at = "
+        "(SELECT leads.created_at FROM leads WHERE leads.id = payment.lead_id) "
+        "WHERE created_at IS NULL"
+    ))
+
+    if "ix_payment_released_created" not in {i["name"] for i in inspect(conn).get_indexes("payment")}:
+        conn.execute(text("CREATE INDEX ix_payment_released_created ON payment (released, created_at)"))
@@ -1,7 +1,34 @@
 from extensions import db
 from decimal import Decimal
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+import re
+from passwords import hash_password, verify_password
+from sqlalchemy.orm import validates
+
+
+def normalize_mobile(mobile):
+    """Digits only, without the +91 / 0 prefix: "+91 98765-43210" -> "9876543210"."""
+    digits = re.sub(r"\D", "", mobile or "")
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits or None
+
+
+def _mobile_default(context):
+    # Core bulk inserts (import, seeders) ke liye bhi normalized value
+    return normalize_mobile(context.get_current_parameters().get("mobile"))
+
+
+class NormalizedMobileMixin:
+    mobile_normalized = db.Column(db.String(20), unique=True, index=True, default=_mobile_default)
+
+    @validates("mobile")
+    def _set_mobile_normalized(self, key, mobile):
+        self.mobile_normalized = normalize_mobile(mobile)
+        return mobile
+
 
 class Admin(db.Model):
     __tablename__ = "admin"
@@ -14,13 +41,13 @@ class Admin(db.Model):
     role = db.Column(db.String(50), default='admin')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 
-class Partner(db.Model):
+class Partner(NormalizedMobileMixin, db.Model):
     __tablename__ = "partner"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -35,6 +62,8 @@ class Partner(db.Model):
     default='active',
     nullable=False
 )   
+    # bumped on status change to revoke already issued tokens
+    token_version = db.Column(db.Integer, default=0, nullable=False)
 
     bank_name = db.Column(db.String(100))
     account_holder_name = db.Column(db.String(100))
@@ -53,14 +82,24 @@ class Partner(db.Model):
     payments = db.relationship('Payment', backref='partner', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 
-class Lead(db.Model):
+class Lead(NormalizedMobileMixin, db.Model):
     __tablename__ = "leads"   
+    __table_args__ = (
+        # admin.leads / employee feed keyset order
+        db.Index("ix_leads_created_id", "created_at", "id"),
+        db.Index("ix_leads_status_created_id", "status", "created_at", "id"),
+        # partner dashboard listing + per-partner report counts
+        db.Index("ix_leads_partner_created_id", "partner_id", "created_at", "id"),
+        db.Index("ix_leads_partner_status", "partner_id", "status"),
+        db.Index("ix_leads_course_created_id", "course_id", "created_at", "id"),
+        db.Index("ix_leads_remark_updated_at", "remark_updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(150), nullable=False)
@@ -97,15 +136,27 @@ class Lead(db.Model):
 
 class Payment(db.Model):
     __tablename__ = "payment"
+    __table_args__ = (
+        # partner report / dashboard payment sums (covering)
+        db.Index("ix_payment_partner_released_amount", "partner_id", "released", "amount"),
+        # admin report pending sum (covering)
+        db.Index("ix_payment_released_amount", "released", "amount"),
+        db.Index("ix_payment_lead", "lead_id"),
+        # admin bulk release by date range
+        db.Index("ix_payment_released_created", "released", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     partner_id = db.Column(db.Integer, db.ForeignKey('partner.id'))
     lead_id = db.Column(db.Integer, db.ForeignKey('leads.id'))
-    amount = db.Column(db.Float, default=0)
+    amount = db.Column(db.Numeric(12, 2), default=Decimal("0.00"))
     released = db.Column(db.Boolean, default=False)
     release_date = db.Column(db.DateTime)
+    # "commission:lead:<id>" -- ek lead ki commission ek hi baar
+    idempotency_key = db.Column(db.String(64), unique=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class Employee(db.Model):
+class Employee(NormalizedMobileMixin, db.Model):
     __tablename__ = "employee"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -118,12 +169,13 @@ class Employee(db.Model):
     default='active',
     nullable=False
 )
+    token_version = db.Column(db.Integer, default=0, nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
 
 class Course(db.Model):
@@ -147,4 +199,19 @@ class Course(db.Model):
 
     def apply_discount(self):
         discount_amount = (self.price * self.discount) / Decimal("100")
-        self.real_price = self.price - discount_amount
\ No newline at end of file
+        self.real_price = self.price - discount_amount
+
+class DashboardCounter(db.Model):
+    __tablename__ = "dashboard_counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DataVersion(db.Model):
+    __tablename__ = "data_versions"
+
+    # "global" ya "partner:<id>"; report/payment APIs ke ETag isse bante hain
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,72 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_, func
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    # Bad / tampered cursor -> start from the first page
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(query, created_col, id_col, cursor, page_size):
+    """Newest-first page of `query` after `cursor` on (created_at, id).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    position = decode_cursor(cursor)
+    if position:
+        created_at, row_id = position
+        query = query.filter(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < row_id),
+        ))
+
+    rows = (
+        query.order_by(created_col.desc(), id_col.desc())
+        .limit(page_size + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def selective(condition, dialect_name):
+    """Mark `condition` as matching few rows for SQLite's planner.
+
+    Without range statistics SQLite prefers walking the (created_at, id)
+    index for ORDER BY ... LIMIT over a selective range filter on another
+    column, which reads the whole table. unlikely() is a no-op for the
+    result; MySQL estimates ranges itself, so it gets the plain condition.
+    """
+    if dialect_name == "sqlite":
+        return func.unlikely(condition)
+    return condition
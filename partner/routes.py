@@ -1,11 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from flask_jwt_extended import get_jwt_identity
-from models import Lead, Payment, Partner
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_file, abort
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from models import Lead, Payment, Partner, normalize_mobile
 from extensions import db
-from auth.routes import role_required
+from auth.routes import role_required, current_identity, issue_token
+from pagination import keyset_page
+import counters
+import data_version
+from data_version import versioned, partner_scope
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from decimal import Decimal
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+import csv
+import io
 import os
-from werkzeug.utils import secure_filename
+import storage
 
 
 partner_bp = Blueprint("partner", __name__, template_folder="templates/partner")
@@ -14,14 +24,14 @@ partner_bp = Blueprint("partner", __name__, template_folder="templates/partner")
 @role_required("partner")
 def dashboard():
     partner_id = get_jwt_identity()
-    partner = Partner.query.get(partner_id)
 
-    if partner.status != "active":
-        flash("Your account is blocked by Admin", "error")
-        return redirect(url_for("auth.logout"))
-    
-    leads = Lead.query.filter_by(partner_id=partner_id).all()
-    total_revenue = 0
+    # course aur ledger entry ek hi query me, per-lead lazy load nahi
+    leads, next_cursor = keyset_page(
+        Lead.query.options(joinedload(Lead.course), joinedload(Lead.payment)).filter_by(partner_id=partner_id),
+        Lead.created_at, Lead.id,
+        request.args.get("cursor"),
+        current_app.config["LEADS_PAGE_SIZE"]
+    )
 
     for l in leads:
         # default values (blank)
@@ -32,33 +42,39 @@ def dashboard():
         if l.status == "Converted" and l.course:
             l.course_name = l.course.title
             l.course_price = l.course.price
-            l.partner_revenue = (l.course.price * Decimal("0.25")).quantize(Decimal("0.01"))
-            total_revenue += l.partner_revenue
+            l.partner_revenue = l.payment.amount if l.payment else ""
+
+    # commission ledger ka SUM, (partner_id, released, amount) index se hi
+    total_revenue = (
+        db.session.query(func.sum(Payment.amount))
+        .filter(Payment.partner_id == partner_id)
+        .scalar()
+    ) or 0
 
     return render_template(
         "dashboard.html",
-        partner_name=partner.name,
+        partner_name=current_identity().name,
         leads=leads,
-        total_payment=round(total_revenue, 2)
+        next_cursor=next_cursor,
+        is_first_page=not request.args.get("cursor"),
+        total_payment=round(Decimal(str(total_revenue)), 2)
     )
 
 @partner_bp.route("/create_lead", methods=["GET", "POST"])
 @role_required("partner")
 def create_lead():
     partner_id = get_jwt_identity()
-    partner = Partner.query.get(partner_id)
-    partner_name = partner.name
+    partner_name = current_identity().name
     
     if request.method == "POST":
-        student_name=request.form['student_name'],
-        mobile=request.form['mobile'],
-        email=request.form['email'],
-        current_status=request.form['current_status'],
-        address=request.form['address'],
-        partner_id=partner_id
+        student_name=request.form['student_name']
+        mobile=request.form['mobile']
+        email=request.form['email']
+        current_status=request.form['current_status']
+        address=request.form['address']
     
 
-        existing_lead = Lead.query.filter_by(mobile=mobile).first()
+        existing_lead = Lead.query.filter_by(mobile_normalized=normalize_mobile(mobile)).first()
         if existing_lead:
             flash("Mobile number already exists!", "danger")
             return redirect(url_for("partner.create_lead"))
@@ -67,6 +83,8 @@ def create_lead():
         
         try:
             db.session.add(lead)
+            counters.bump(counters.LEADS)
+            data_version.bump(partner_id)
             db.session.commit()
             flash("Lead created successfully", "success")
             return redirect(url_for("partner.dashboard"))
@@ -76,16 +94,136 @@ def create_lead():
             return redirect(url_for("partner.create_lead"))
     return render_template("create_lead.html", partner_name=partner_name)
 
+@partner_bp.route("/api/check_mobile")
+@role_required("partner")
+def check_mobile():
+    # create lead form type karte waqt call karta hai; unique index pe ek lookup
+    normalized = normalize_mobile(request.args.get("mobile"))
+    if not normalized:
+        return jsonify({"mobile": None, "exists": False})
+
+    exists = db.session.query(
+        Lead.query.filter_by(mobile_normalized=normalized).exists()
+    ).scalar()
+    return jsonify({"mobile": normalized, "exists": exists})
+
+IMPORT_FIELDS = ["student_name", "mobile", "email", "current_status", "address"]
+# Lead columns ke size; strict MySQL lambi value pe poora import fail kar deta
+IMPORT_MAX_LENGTHS = {"student_name": 150, "mobile": 20, "email": 255,
+                      "current_status": 255, "address": 500}
+
+def validate_import_row(row):
+    data = {f: (row.get(f) or "").strip() for f in IMPORT_FIELDS}
+    if not data["student_name"]:
+        return data, "Student name is required"
+    if not data["mobile"]:
+        return data, "Mobile is required"
+    if not normalize_mobile(data["mobile"]):
+        return data, "Invalid mobile"
+    for field, limit in IMPORT_MAX_LENGTHS.items():
+        if len(data[field]) > limit:
+            return data, f"{field} is longer than {limit} characters"
+    if data["email"] and "@" not in data["email"]:
+        return data, "Invalid email"
+    return data, None
+
+def import_batch(batch, partner_id, seen, report):
+    # ek query me poore batch ke duplicates
+    mobiles = [normalize_mobile(data["mobile"]) for _, data in batch]
+    existing = {
+        m for (m,) in db.session.query(Lead.mobile_normalized).filter(Lead.mobile_normalized.in_(mobiles))
+    }
+
+    rows = []
+    for (line_no, data), normalized in zip(batch, mobiles):
+        if normalized in existing or normalized in seen:
+            report.append({"row": line_no, "mobile": data["mobile"], "accepted": False,
+                           "reason": "Mobile number already exists"})
+            continue
+        seen.add(normalized)
+        rows.append(dict(data, mobile_normalized=normalized, partner_id=partner_id,
+                         status="Pending", created_at=datetime.utcnow()))
+        report.append({"row": line_no, "mobile": data["mobile"], "accepted": True, "reason": ""})
+
+    if rows:
+        db.session.execute(db.insert(Lead), rows)
+    return len(rows)
+
+@partner_bp.route("/import_leads", methods=["GET", "POST"])
+@role_required("partner")
+def import_leads():
+    partner_id = get_jwt_identity()
+    partner_name = current_identity().name
+    report = None
+
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Please choose a CSV file", "error")
+            return redirect(url_for("partner.import_leads"))
+
+        batch_size = current_app.config["IMPORT_BATCH_SIZE"]
+        max_rows = current_app.config["IMPORT_MAX_ROWS"]
+
+        # file poori memory me nahi padhte, line by line
+        reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""))
+        report, batch, seen, accepted = [], [], set(), 0
+        try:
+            # header padhte hi pehla chunk decode hota hai, isliye try ke andar
+            missing = [f for f in ("student_name", "mobile") if f not in (reader.fieldnames or [])]
+            if missing:
+                flash(f"CSV header must include: {', '.join(missing)}", "error")
+                return redirect(url_for("partner.import_leads"))
+
+            for line_no, row in enumerate(reader, start=2):
+                if line_no - 1 > max_rows:
+                    report.append({"row": line_no, "mobile": "", "accepted": False,
+                                   "reason": f"Row limit of {max_rows} reached, rest skipped"})
+                    break
+
+                data, error = validate_import_row(row)
+                if error:
+                    report.append({"row": line_no, "mobile": data["mobile"], "accepted": False, "reason": error})
+                    continue
+
+                batch.append((line_no, data))
+                if len(batch) >= batch_size:
+                    accepted += import_batch(batch, partner_id, seen, report)
+                    batch = []
+
+            if batch:
+                accepted += import_batch(batch, partner_id, seen, report)
+
+            # saare batches ek hi transaction me
+            if accepted:
+                counters.bump(counters.LEADS, accepted)
+                data_version.bump(partner_id)
+            db.session.commit()
+        except (UnicodeDecodeError, csv.Error):
+            db.session.rollback()
+            flash("Could not read the file. Please save it as CSV UTF-8 and upload again.", "error")
+            return redirect(url_for("partner.import_leads"))
+        except IntegrityError:
+            db.session.rollback()
+            flash("Duplicate entry detected, nothing was imported. Please retry.", "danger")
+            return redirect(url_for("partner.import_leads"))
+
+        report.sort(key=lambda r: r["row"])
+        flash(f"{accepted} leads imported, {len(report) - accepted} rejected",
+              "success" if accepted else "error")
+
+    return render_template("import_leads.html", partner_name=partner_name,
+                           report=report, fields=IMPORT_FIELDS)
+
 @partner_bp.route("/payment")
 @role_required("partner")
 def payments_page():
-    partner_id = get_jwt_identity()
-    partner = Partner.query.get(partner_id)
-    partner_name = partner.name
+    partner_name = current_identity().name
     return render_template("payment.html", partner_name=partner_name)
 
 @partner_bp.route("/api/payment")
 @role_required("partner")
+@versioned(lambda: partner_scope(get_jwt_identity()))
 def payments_api():
     partner_id = get_jwt_identity() 
 
@@ -180,7 +318,39 @@ def payments_api():
 #     return render_template("profile.html", partner=partner, partner_name=partner_name)
 
 
-UPLOAD_FOLDER = "static/uploads/bank_proofs"
+@partner_bp.app_template_global()
+def document_url(value):
+    # purane static/ uploads `flask migrate-legacy-documents` store me le aata hai
+    return url_for("partner.document", key=value)
+
+@partner_bp.route("/documents/<key>")
+@jwt_required()
+def document(key):
+    identity = current_identity()
+    if not storage.is_valid_key(key):
+        abort(404)
+
+    # admin sab dekh sakta hai, partner sirf apne documents
+    if identity.role != "admin":
+        if identity.role != "partner":
+            abort(403)
+        owned = db.session.query(
+            Partner.query.filter(
+                Partner.id == identity.id,
+                db.or_(*[getattr(Partner, f) == key for f in storage.DOCUMENT_FIELDS])
+            ).exists()
+        ).scalar()
+        if not owned:
+            abort(404)
+
+    path = storage.path_for(key)
+    if not os.path.exists(path):
+        abort(404)
+
+    # content-addressed: same key = same bytes, isliye immutable
+    resp = send_file(path, conditional=True, etag=key, max_age=31536000)
+    resp.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    return resp
 
 @partner_bp.route("/profile", methods=["GET", "POST"])
 @role_required("partner")
@@ -197,57 +367,54 @@ def update_profile():
         partner.profession = request.form.get("profession")
         partner.email = request.form.get("email")
 
-        # ---------------- BANK DETAILS (ONLY ONCE) ----------------
-        if not partner.bank_details_locked:
-            bank_name = request.form.get("bank_name")
-            acc_holder = request.form.get("account_holder_name")
-            acc_number = request.form.get("account_number")
-            ifsc = request.form.get("ifsc_code")
-            bank_proof = request.files.get("bank_proof")
-
-            if bank_name and acc_number and bank_proof:
-                filename = secure_filename(bank_proof.filename)
-                os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                bank_proof.save(file_path)
-
-                partner.bank_name = bank_name
-                partner.account_holder_name = acc_holder
-                partner.account_number = acc_number
-                partner.ifsc_code = ifsc
-                partner.bank_proof = file_path
-                partner.bank_details_locked = True
-
-        # ---------------- DOCUMENT UPLOAD ----------------
-        aadhar_number = request.form.get("aadhar_number")
-        pan_number = request.form.get("pan_number")
-
-        aadhar_file = request.files.get("aadhar_doc")
-        pan_file = request.files.get("pan_doc")
-
-        DOC_FOLDER = os.path.join(UPLOAD_FOLDER, "documents")
-        os.makedirs(DOC_FOLDER, exist_ok=True)
-
-        if aadhar_number and aadhar_file:
-            aadhar_filename = secure_filename(aadhar_file.filename)
-            aadhar_path = os.path.join(DOC_FOLDER, aadhar_filename)
-            aadhar_file.save(aadhar_path)
-
-            partner.aadhar_number = aadhar_number
-            partner.aadhar_doc = aadhar_path
-
-        if pan_file and pan_file:
-            pan_filename = secure_filename(pan_file.filename)
-            pan_path = os.path.join(DOC_FOLDER, pan_filename)
-            pan_file.save(pan_path)
+        # is request me naye likhe files; fail hone par hata dete hain
+        created = []
+        try:
+            # ---------------- BANK DETAILS (ONLY ONCE) ----------------
+            if not partner.bank_details_locked:
+                bank_name = request.form.get("bank_name")
+                acc_holder = request.form.get("account_holder_name")
+                acc_number = request.form.get("account_number")
+                ifsc = request.form.get("ifsc_code")
+                bank_proof = request.files.get("bank_proof")
+
+                if bank_name and acc_number and bank_proof:
+                    partner.bank_name = bank_name
+                    partner.account_holder_name = acc_holder
+                    partner.account_number = acc_number
+                    partner.ifsc_code = ifsc
+                    partner.bank_proof = storage.save_upload(bank_proof, created)
+                    partner.bank_details_locked = True
+
+            # ---------------- DOCUMENT UPLOAD ----------------
+            aadhar_number = request.form.get("aadhar_number")
+            pan_number = request.form.get("pan_number")
+
+            aadhar_file = request.files.get("aadhar_doc")
+            pan_file = request.files.get("pan_doc")
+
+            if aadhar_number and aadhar_file:
+                partner.aadhar_number = aadhar_number
+                partner.aadhar_doc = storage.save_upload(aadhar_file, created)
+
+            if pan_file and pan_file:
+                partner.pan_number = pan_number
+                partner.pan_doc = storage.save_upload(pan_file, created)
 
-            partner.pan_number = pan_number
-            partner.pan_doc = pan_path
+            db.session.commit()
+        except storage.InvalidUpload as e:
+            db.session.rollback()
+            storage.discard(created)
+            flash(str(e), "error")
+            return redirect(url_for("partner.update_profile"))
+        except Exception:
+            db.session.rollback()
+            storage.discard(created)
+            raise
 
-        db.session.commit()
         flash("Profile updated successfully", "success")
-        return redirect(url_for("partner.update_profile"))
+        # naam JWT claim me hai, isliye naya token
+        return issue_token(redirect(url_for("partner.update_profile")), partner, "partner")
 
     return render_template(
         "profile.html",
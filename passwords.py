@@ -0,0 +1,149 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = "scrypt"
+DEFAULT_SALT_LENGTH = 16
+
+
+class LoginBusy(Exception):
+    """Hash pool is saturated; the caller should ask the user to retry."""
+
+
+def current_policy():
+    """(method, salt_length) from config; read it before handing work to the pool."""
+    if has_app_context():
+        config = current_app.config
+        return (config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+                config.get("PASSWORD_SALT_LENGTH", DEFAULT_SALT_LENGTH))
+    return DEFAULT_METHOD, DEFAULT_SALT_LENGTH
+
+
+def hash_password(password, policy=None):
+    method, salt_length = policy or current_policy()
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def verify_password(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+_method_prefixes = {}
+
+def _method_prefix(method):
+    # "scrypt" -> "scrypt:32768:8:1", werkzeug ke defaults ke saath
+    if method not in _method_prefixes:
+        _method_prefixes[method] = generate_password_hash("-", method=method).split("$", 1)[0]
+    return _method_prefixes[method]
+
+
+def needs_rehash(password_hash):
+    method, salt_length = current_policy()
+    prefix, _, rest = password_hash.partition("$")
+    salt = rest.split("$", 1)[0]
+    return prefix != _method_prefix(method) or len(salt) != salt_length
+
+
+class HashPool:
+    """Bounded thread pool for KDF work.
+
+    scrypt/pbkdf2 release the GIL, so a few threads keep the CPU busy
+    while the queue bound makes a login storm fail fast instead of
+    tying up every request thread.
+    """
+
+    def __init__(self, workers, queue_size, wait_timeout):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.wait_timeout = wait_timeout
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(timeout=self.wait_timeout):
+            raise LoginBusy()
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+
+class AttemptLimiter:
+    """Sliding-window count of failed logins per key, kept in-process.
+
+    Expired keys are swept once per window and the table is capped at
+    max_keys, so failures for random mobiles cannot grow memory forever.
+    """
+
+    def __init__(self, max_attempts, window, max_keys=100000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.swept_at = time.monotonic()
+
+    def _sweep(self, now):
+        # lock ke andar call hota hai
+        if now - self.swept_at >= self.window:
+            for key in list(self.failures):
+                self._recent(key, now)
+            self.swept_at = now
+        # phir bhi bahut zyada (ek window me hi flood) -> sabse purane keys hatao
+        excess = len(self.failures) - self.max_keys + 1
+        if excess > 0:
+            for key in list(self.failures)[:excess]:
+                del self.failures[key]
+
+    def _recent(self, key, now):
+        attempts = self.failures.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self.failures[key]
+            return None
+        return attempts
+
+    def is_blocked(self, key):
+        with self.lock:
+            attempts = self._recent(key, time.monotonic())
+            return attempts is not None and len(attempts) >= self.max_attempts
+
+    def record_failure(self, key):
+        now = time.monotonic()
+        with self.lock:
+            attempts = self._recent(key, now)
+            if attempts is None:
+                self._sweep(now)
+                attempts = self.failures[key] = deque()
+            attempts.append(now)
+
+    def reset(self, key):
+        with self.lock:
+            self.failures.pop(key, None)
+
+
+def init_app(app):
+    config = app.config
+    app.extensions["password_pool"] = HashPool(
+        config["LOGIN_HASH_WORKERS"],
+        config["LOGIN_HASH_QUEUE"],
+        config["LOGIN_HASH_WAIT"],
+    )
+    app.extensions["login_limiter"] = AttemptLimiter(
+        config["LOGIN_MAX_ATTEMPTS"],
+        config["LOGIN_ATTEMPT_WINDOW"],
+        config["LOGIN_LIMITER_MAX_KEYS"],
+    )
+
+
+def pool():
+    return current_app.extensions["password_pool"]
+
+
+def limiter():
+    return current_app.extensions["login_limiter"]
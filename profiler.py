@@ -0,0 +1,193 @@
+"""On-demand cProfile sampling of live requests.
+
+An admin turns it on from /admin/profiler. Settings live in a small
+JSON file under PROFILE_DIR so every worker on the box picks them up
+(re-read at most every PROFILER_CHECK_INTERVAL seconds). Each worker
+merges its samples per endpoint in memory and writes them to
+PROFILE_DIR/<endpoint>.<generation>.<pid>.pstats at most every
+PROFILER_FLUSH_INTERVAL seconds (and before serving a download);
+downloads merge all workers' files.
+
+The "always profile" header is only honoured when its value matches
+PROFILER_HEADER_SECRET, so clients cannot force the slow path.
+
+When disabled a request pays one time comparison.
+"""
+import os
+import glob
+import json
+import time
+import atexit
+import hmac
+import random
+import marshal
+import cProfile
+import pstats
+import threading
+
+from flask import g, request, current_app
+
+SETTINGS_FILE = "settings.json"
+DEFAULT_SETTINGS = {"enabled": False, "rate": 0.01, "endpoints": [], "header": "X-Profile", "generation": 1}
+
+
+class Profiler:
+    def __init__(self, directory, check_interval, flush_interval, header_secret):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.flush_interval = flush_interval
+        self.header_secret = header_secret
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.checked_at = 0.0
+        self.flushed_at = time.monotonic()
+        self.stats = {}      # endpoint -> (pstats.Stats, samples, seconds)
+        self.dirty = set()   # endpoints jinke naye samples abhi disk pe nahi
+        self.lock = threading.Lock()
+
+    # settings
+
+    def _settings_path(self):
+        return os.path.join(self.directory, SETTINGS_FILE)
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return self.settings
+        self.checked_at = now
+        try:
+            with open(self._settings_path()) as f:
+                settings = dict(DEFAULT_SETTINGS, **json.load(f))
+        except (OSError, ValueError):
+            settings = dict(DEFAULT_SETTINGS)
+
+        with self.lock:
+            if settings["generation"] != self.settings["generation"]:
+                # reset hua: purane samples chhod do
+                self.stats = {}
+                self.dirty = set()
+            self.settings = settings
+        return settings
+
+    def save(self, **changes):
+        settings = dict(self.refresh(), **changes)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._settings_path() + f".{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(settings, f)
+        os.replace(tmp, self._settings_path())
+        self.checked_at = 0.0
+        return self.refresh()
+
+    def reset(self):
+        generation = self.refresh()["generation"]
+        for path in glob.glob(os.path.join(self.directory, f"*.{generation}.*.*")):
+            os.remove(path)
+        return self.save(generation=generation + 1)
+
+    # sampling
+
+    def should_profile(self):
+        settings = self.refresh()
+        if not settings["enabled"] or request.endpoint is None:
+            return False
+        if settings["header"] and self.header_secret:
+            sent = request.headers.get(settings["header"], "")
+            if sent and hmac.compare_digest(sent.encode(), self.header_secret.encode()):
+                return True
+        if settings["endpoints"] and request.endpoint not in settings["endpoints"]:
+            return False
+        return random.random() < settings["rate"]
+
+    def record(self, endpoint, profile, seconds):
+        with self.lock:
+            stats, samples, total = self.stats.get(endpoint, (None, 0, 0.0))
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            self.stats[endpoint] = (stats, samples + 1, total + seconds)
+            self.dirty.add(endpoint)
+        if time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write this worker's changed endpoints to PROFILE_DIR."""
+        generation = self.settings["generation"]
+        with self.lock:
+            self.flushed_at = time.monotonic()
+            if not self.dirty:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for endpoint in self.dirty:
+                stats, samples, total = self.stats[endpoint]
+                base = os.path.join(self.directory, f"{endpoint}.{generation}.{os.getpid()}")
+                stats.dump_stats(base + ".pstats")
+                with open(base + ".json", "w") as f:
+                    json.dump({"samples": samples, "seconds": total}, f)
+            self.dirty = set()
+
+    # reading (all workers)
+
+    def summary(self):
+        """{endpoint: {"samples": n, "seconds": t}} across every worker."""
+        generation = self.refresh()["generation"]
+        self.flush()
+        result = {}
+        for path in glob.glob(os.path.join(self.directory, f"*.{generation}.*.json")):
+            endpoint = os.path.basename(path).rsplit(".", 3)[0]
+            with open(path) as f:
+                data = json.load(f)
+            row = result.setdefault(endpoint, {"samples": 0, "seconds": 0.0})
+            row["samples"] += data["samples"]
+            row["seconds"] += data["seconds"]
+        return dict(sorted(result.items()))
+
+    def merged(self, endpoint):
+        generation = self.refresh()["generation"]
+        self.flush()
+        files = glob.glob(os.path.join(self.directory, f"{glob.escape(endpoint)}.{generation}.*.pstats"))
+        if not files:
+            return None
+        return pstats.Stats(*files)
+
+
+def to_bytes(stats):
+    # dump_stats() jaisa hi format, bas file ke bajay memory me
+    return marshal.dumps(stats.stats)
+
+
+def _start():
+    profiler = current_app.extensions["profiler"]
+    if not profiler.should_profile():
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # is thread pe koi aur profiler already chal raha hai
+        return
+    g.profile = (profile, time.perf_counter())
+
+
+def _stop(exc):
+    # teardown: streamed pages ka rendering bhi sample me aata hai
+    active = g.pop("profile", None)
+    if active is None:
+        return
+    profile, started = active
+    profile.disable()
+    current_app.extensions["profiler"].record(request.endpoint, profile, time.perf_counter() - started)
+
+
+def current():
+    return current_app.extensions["profiler"]
+
+
+def init_app(app):
+    sampler = Profiler(app.config["PROFILE_DIR"], app.config["PROFILER_CHECK_INTERVAL"],
+                       app.config["PROFILER_FLUSH_INTERVAL"], app.config["PROFILER_HEADER_SECRET"])
+    app.extensions["profiler"] = sampler
+    # worker band hote waqt bache hue samples
+    atexit.register(sampler.flush)
+    app.before_request(_start)
+    app.teardown_request(_stop)
@@ -0,0 +1,182 @@
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, and_, or_
+
+from extensions import db
+from models import Lead, Payment
+from report.routes import lead_stats_query, payment_stats_query
+from pagination import selective
+from datagen import generate
+
+# sirf badi tables pe full scan fail hai; courses/partner chhoti lookup tables hain
+HOT_TABLES = {"leads", "payment"}
+
+# non-covering index walk jo jaan-boojh kar theek hai (LIMIT ke saath pehle rows pe hi rukta hai)
+ALLOWED_INDEX_SCANS = {"admin.leads first page"}
+
+
+def hot_queries():
+    """(name, statement) pairs mirroring the filters used in the routes."""
+    cursor_at = datetime(2026, 1, 1)
+
+    return [
+        ("admin.leads first page",
+         select(Lead).order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("partner.create_lead duplicate check",
+         select(Lead.id).where(Lead.mobile_normalized == "9800000001").limit(1)),
+
+        ("admin.leads by status",
+         select(Lead).where(Lead.status == "Pending")
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("admin.leads by partner, next page",
+         select(Lead).where(
+             Lead.partner_id == 1,
+             or_(Lead.created_at < cursor_at,
+                 and_(Lead.created_at == cursor_at, Lead.id < 1000)))
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("admin.leads by course",
+         select(Lead).where(Lead.course_id == 1)
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("admin.leads by date range",
+         select(Lead).where(Lead.created_at >= cursor_at,
+                            Lead.created_at < cursor_at + timedelta(days=1))
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("employee feed remark_since",
+         select(Lead).where(selective(Lead.remark_updated_at >= cursor_at, db.engine.dialect.name))
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("partner.dashboard listing",
+         select(Lead).where(Lead.partner_id == 1)
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+
+        ("partner.dashboard revenue",
+         select(func.sum(Payment.amount)).where(Payment.partner_id == 1)),
+
+        ("admin.update_lead commission entry",
+         select(Payment).where(Payment.idempotency_key == "commission:lead:1")),
+
+        ("report partner lead stats",
+         lead_stats_query().filter(Lead.partner_id == 1).statement),
+
+        ("report admin lead stats",
+         lead_stats_query().statement),
+
+        ("report partner payment stats",
+         payment_stats_query().filter(Payment.partner_id == 1).statement),
+
+        ("report admin payment stats",
+         payment_stats_query().statement),
+
+        ("report per-partner lead matrix",
+         lead_stats_query().add_columns(Lead.partner_id).group_by(Lead.partner_id).statement),
+
+        ("report per-partner payment matrix",
+         payment_stats_query().add_columns(Payment.partner_id).group_by(Payment.partner_id).statement),
+
+        ("admin.release_payments by date range",
+         select(Payment.partner_id, func.count(Payment.id), func.sum(Payment.amount))
+         .where(Payment.released == False, Payment.created_at >= cursor_at,
+                Payment.created_at < cursor_at + timedelta(days=30))
+         .group_by(Payment.partner_id)),
+
+        ("partner.payments_api",
+         select(Payment, Lead).join(Lead, Payment.lead_id == Lead.id)
+         .where(Payment.partner_id == 1)),
+    ]
+
+
+def explain(statement):
+    """Return the full table or full index scans on HOT_TABLES for `statement`.
+
+    A scan of a covering index (aggregates over narrow indexes) is not
+    reported; a scan of a non-covering index reads every row and is.
+    """
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    with db.engine.connect() as conn:
+        if dialect.name == "sqlite":
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).fetchall()
+            details = [r[-1] for r in rows]
+            # "SCAN leads" = full scan, "SCAN leads USING INDEX ..." = poori index walk,
+            # "SCAN leads USING COVERING INDEX ..." = sirf index pages, table nahi
+            scans = [d for d in details
+                     if re.fullmatch(r"SCAN (\w+)( AS \w+)?( USING (?!COVERING )INDEX .*)?", d)]
+            return [d for d in scans if d.split()[1] in HOT_TABLES]
+
+        if dialect.name in ("mysql", "mariadb"):
+            rows = conn.exec_driver_sql("EXPLAIN " + sql).mappings().fetchall()
+            # type=index bina "Using index" = non-covering index ka full scan
+            return [
+                f"{r['type']} {r['table']}" for r in rows
+                if r["table"] in HOT_TABLES and (
+                    r["type"] == "ALL"
+                    or (r["type"] == "index" and "Using index" not in (r["Extra"] or "")))
+            ]
+
+    raise click.ClickException(f"EXPLAIN check not supported for {dialect.name}")
+
+
+def seed_minimal(leads=5000, partners=50, courses=10):
+    # planner ko realistic stats milne chahiye, warna chhoti table pe SCAN hi chunega
+    generate(leads=leads, partners=partners, courses=courses)
+
+
+def _is_index_walk(scan):
+    # allow-list sirf index walk maaf karta hai, bina index wala full scan kabhi nahi
+    return " USING INDEX " in scan or scan.startswith("index ")
+
+
+def check_plans():
+    failures = []
+    for name, statement in hot_queries():
+        scans = explain(statement)
+        if not scans:
+            status = "ok"
+        elif name in ALLOWED_INDEX_SCANS and all(_is_index_walk(s) for s in scans):
+            status = "allowed " + ", ".join(scans)
+        else:
+            status = "FULL SCAN " + ", ".join(scans)
+            failures.append(name)
+        click.echo(f"{name:<40} {status}")
+    return failures
+
+
+@click.command("check-query-plans")
+@click.option("--seed/--no-seed", default=True,
+              help="Run against a freshly seeded scratch SQLite DB (default) "
+                   "instead of the configured database.")
+@click.option("--leads", default=5000, show_default=True, help="Leads to seed.")
+@with_appcontext
+def check_query_plans_command(seed, leads):
+    """EXPLAIN the hot lead/payment queries and fail on full table scans."""
+    if seed:
+        from app import create_app
+
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            scratch = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+            with scratch.app_context():
+                db.create_all()
+                seed_minimal(leads=leads)
+                failures = check_plans()
+                db.engine.dispose()
+        finally:
+            os.remove(path)
+    else:
+        failures = check_plans()
+
+    if failures:
+        raise click.ClickException(f"{len(failures)} hot queries fall back to a full table scan")
+    click.echo("All hot queries use an index.")
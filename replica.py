@@ -0,0 +1,92 @@
+import time
+import logging
+import threading
+from functools import wraps
+
+from flask import g, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import select
+
+REPLICA = "replica"
+
+log = logging.getLogger(__name__)
+
+_state = {"checked_at": 0.0, "healthy": False}
+_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to the replica bind while a view opted in with
+    @replica_reads; flushes, writes and everything else use the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get("use_replica")
+            and getattr(clause, "is_select", False)
+        ):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_lag_ok(db):
+    """True if the replica is close enough to the primary to serve reads."""
+    replica = db.engines[REPLICA]
+    max_lag = current_app.config["REPLICA_MAX_LAG"]
+
+    with replica.connect() as conn:
+        if replica.dialect.name in ("mysql", "mariadb"):
+            status = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+            if status is None:
+                return False
+            lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+            return lag is not None and lag <= max_lag
+
+        # baaki DBs (local SQLite pair) pe seconds nahi milte: global data version compare
+        from models import DataVersion
+        query = select(DataVersion.version).where(DataVersion.scope == "global")
+        replica_version = conn.execute(query).scalar() or 0
+
+    with db.engines[None].connect() as conn:
+        primary_version = conn.execute(query).scalar() or 0
+    return replica_version >= primary_version
+
+
+def replica_available():
+    from extensions import db
+
+    if REPLICA not in db.engines:
+        return False
+
+    interval = current_app.config["REPLICA_CHECK_INTERVAL"]
+    now = time.monotonic()
+    if now - _state["checked_at"] < interval:
+        return _state["healthy"]
+
+    with _lock:
+        if now - _state["checked_at"] < interval:
+            return _state["healthy"]
+        try:
+            healthy = _replica_lag_ok(db)
+        except Exception:
+            log.warning("Replica check failed, reading from primary", exc_info=True)
+            healthy = False
+        if not healthy:
+            log.info("Replica missing or lagging, reading from primary")
+        _state.update(checked_at=now, healthy=healthy)
+        return healthy
+
+
+def replica_reads(fn):
+    """Route this view's SELECTs to the read replica when it is healthy.
+
+    Put it below role_required/jwt_required so the auth lookups stay on
+    the primary.
+    """
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        g.use_replica = replica_available()
+        return fn(*args, **kwargs)
+    return decorator
@@ -1,75 +1,103 @@
 from flask import Blueprint, render_template, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Lead, Payment, Partner, Admin
+from flask_jwt_extended import get_jwt_identity
+from models import Lead, Payment
 from extensions import db
+from auth.routes import current_identity, role_required
+from data_version import versioned, partner_scope, GLOBAL
+from replica import replica_reads
+from aggregates import run_aggregates
 
 report_bp = Blueprint("report", __name__, template_folder="templates/report")
 
 
 @report_bp.route("/admin", methods=["GET"])
-@jwt_required()
+@role_required("admin")
 def admin_reports_page():
-    admin_id = get_jwt_identity()
-    admin_name = Admin.query.get(admin_id).name
+    admin_name = current_identity().name
     return render_template("admin_reports.html", admin_name=admin_name)
 
+def lead_stats_query():
+    # ek scan me total + converted
+    return db.session.query(
+        db.func.count(Lead.id).label("total_leads"),
+        db.func.coalesce(db.func.sum(
+            db.case((Lead.status == "Converted", 1), else_=0)
+        ), 0).label("converted")
+    )
+
+def payment_stats_query():
+    # ek scan me released + pending
+    return db.session.query(
+        db.func.coalesce(db.func.sum(
+            db.case((Payment.released == True, Payment.amount), else_=0)
+        ), 0).label("payment_released"),
+        db.func.coalesce(db.func.sum(
+            db.case((Payment.released == False, Payment.amount), else_=0)
+        ), 0).label("payment_pending")
+    )
+
+def partner_breakdown():
+    results = run_aggregates({
+        "leads": lead_stats_query().add_columns(Lead.partner_id).group_by(Lead.partner_id),
+        "payments": payment_stats_query().add_columns(Payment.partner_id).group_by(Payment.partner_id),
+    })
+    leads, payments = results["leads"], results["payments"]
+
+    rows = {}
+    empty = {"total_leads": 0, "converted": 0, "payment_released": 0, "payment_pending": 0}
+    for r in leads:
+        row = rows.setdefault(r.partner_id, dict(empty, partner_id=r.partner_id))
+        row["total_leads"] = r.total_leads
+        row["converted"] = r.converted
+    for r in payments:
+        row = rows.setdefault(r.partner_id, dict(empty, partner_id=r.partner_id))
+        row["payment_released"] = r.payment_released
+        row["payment_pending"] = r.payment_pending
+
+    return sorted(rows.values(), key=lambda r: (r["partner_id"] is None, r["partner_id"] or 0))
+
 @report_bp.route("/admin/api/reports", methods=["GET"])
-@jwt_required()
+@role_required("admin")
+@replica_reads
+@versioned(lambda: GLOBAL)
 def admin_reports_api():
-    total_leads = Lead.query.count()
+    # ?by=partner -> saare partners ka matrix ek request me
+    if request.args.get("by") == "partner":
+        return jsonify({"partners": partner_breakdown()})
 
-    converted = Lead.query.filter_by(
-        status="converted"
-    ).count()
-
-    payment_pending = db.session.query(
-        db.func.sum(Payment.amount)
-    ).filter_by(
-        released=False
-    ).scalar() or 0
+    # dono aggregates independent hain, alag connections pe saath chalte hain
+    results = run_aggregates({"leads": lead_stats_query(), "payments": payment_stats_query()})
+    leads, payments = results["leads"][0], results["payments"][0]
 
     return {
-        "total_leads": total_leads,
-        "converted": converted,
-        "payment_pending": payment_pending
+        "total_leads": leads.total_leads,
+        "converted": leads.converted,
+        "payment_released": payments.payment_released,
+        "payment_pending": payments.payment_pending
     }
 
 @report_bp.route("/partner", methods=["GET"])
-@jwt_required()
+@role_required("partner")
 def partner_reports():
-    partner_id = get_jwt_identity()
-    partner = Partner.query.get(partner_id)
-    partner_name = partner.name
+    partner_name = current_identity().name
     return render_template("partner_reports.html", partner_name=partner_name)
 
 @report_bp.route("/partner/api/reports", methods=["GET"])
-@jwt_required()
+@role_required("partner")
+@replica_reads
+@versioned(lambda: partner_scope(get_jwt_identity()))
 def partner_reports_api():
     partner_id = get_jwt_identity()
 
-    total_leads = Lead.query.filter_by(partner_id=partner_id).count()
-    converted = Lead.query.filter_by(
-        partner_id=partner_id,
-        status="converted"
-    ).count()
-
-    payment_released = db.session.query(
-        db.func.sum(Payment.amount)
-    ).filter_by(
-        partner_id=partner_id,
-        released=True
-    ).scalar() or 0
-
-    payment_pending = db.session.query(
-        db.func.sum(Payment.amount)
-    ).filter_by(
-        partner_id=partner_id,
-        released=False
-    ).scalar() or 0
+    results = run_aggregates({
+        "leads": lead_stats_query().filter(Lead.partner_id == partner_id),
+        "payments": payment_stats_query().filter(Payment.partner_id == partner_id),
+    })
+    leads, payments = results["leads"][0], results["payments"][0]
 
     return jsonify({
-        "total_leads": total_leads,
-        "converted": converted,
-        "payment_released": payment_released,
-        "payment_pending": payment_pending
-    })
+        "total_leads": leads.total_leads,
+        "converted": leads.converted,
+        "payment_released": payments.payment_released,
+        "payment_pending": payments.payment_pending
+    })
\ No newline at end of file
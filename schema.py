@@ -0,0 +1,94 @@
+import pkgutil
+import importlib
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from extensions import db
+import migrations
+
+VERSION_TABLE = "schema_version"
+
+
+def load_migrations():
+    """[(version, module)] from migrations/vNNNN_*.py, in order."""
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        if info.name.startswith("v") and info.name[1:5].isdigit():
+            module = importlib.import_module(f"migrations.{info.name}")
+            found.append((int(info.name[1:5]), module))
+    return sorted(found, key=lambda m: m[0])
+
+
+def latest_version():
+    return load_migrations()[-1][0]
+
+
+def current_version(conn):
+    try:
+        return conn.execute(text(f"SELECT version FROM {VERSION_TABLE}")).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def upgrade(echo=print):
+    """Apply pending migrations; each one commits with its version bump."""
+    engine = db.engine
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(VERSION_TABLE):
+            conn.execute(text(f"CREATE TABLE {VERSION_TABLE} (version INTEGER NOT NULL)"))
+            conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (0)"))
+
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    for number, module in load_migrations():
+        if number <= version:
+            continue
+        echo(f"Applying {module.__name__.split('.')[-1]}")
+        # MySQL me DDL auto-commit hota hai, isliye har migration idempotent likhi hai
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(text(f"UPDATE {VERSION_TABLE} SET version = :v"), {"v": number})
+        version = number
+    return version
+
+
+def check(app):
+    """Boot-time check: one SELECT, no DDL. Logs if the DB needs `flask db-upgrade`."""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                version = current_version(conn)
+        except Exception:
+            app.logger.warning("Could not read schema version", exc_info=True)
+            return None
+
+    expected = latest_version()
+    if version is None:
+        app.logger.error("Database has no schema version, run `flask db-upgrade`")
+    elif version < expected:
+        app.logger.error("Database schema is at v%s, code expects v%s; run `flask db-upgrade`",
+                         version, expected)
+    elif version > expected:
+        app.logger.warning("Database schema v%s is newer than this code (v%s)", version, expected)
+    return version
+
+
+@click.command("db-upgrade")
+@with_appcontext
+def upgrade_command():
+    """Bring the database schema up to date."""
+    version = upgrade(echo=click.echo)
+    click.echo(f"Database schema at v{version}")
+
+
+@click.command("db-version")
+@with_appcontext
+def version_command():
+    """Show the database and code schema versions."""
+    with db.engine.connect() as conn:
+        version = current_version(conn)
+    click.echo(f"database: v{version if version is not None else '-'}  code: v{latest_version()}")
@@ -0,0 +1,131 @@
+"""Opt-in per-request SQL instrumentation (SQL_INSTRUMENT=1).
+
+Counts statements and DB time per request and sends them back as a
+Server-Timing header, logs slow statements with their parameters
+redacted, and warns when one request runs the same statement shape
+over and over (the usual N+1 signature).
+
+Aggregate pool workers run in a copy of the request's context, so their
+statements count too. For streamed pages the header goes out before
+the body, so it covers the work done up to the first byte; the
+teardown log line has the full totals.
+"""
+import re
+import time
+import logging
+import threading
+from collections import Counter
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+from extensions import db
+
+log = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" / "IN (%s, %s)" -> ek hi shape, warna har list size alag gini jaati
+_IN_LIST_RE = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_WS_RE = re.compile(r"\s+")
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        # aggregate pool ke threads bhi isi object me likhte hain
+        self.lock = threading.Lock()
+
+
+def statement_shape(statement):
+    return _WS_RE.sub(" ", _IN_LIST_RE.sub("(?)", statement)).strip()
+
+
+def redact(parameters):
+    """Types only, never values: mobiles, names and bank details pass through here."""
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} rows>"
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def _stats():
+    if not has_request_context():
+        return None
+    return g.get("sql_stats")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # execution context pe, connection pe nahi: statement fail ho to after
+    # listener nahi chalta, aur context statement ke saath hi chala jaata hai
+    if context is not None:
+        context._sql_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(app):
+    slow = app.config["SQL_SLOW_MS"] / 1000
+    repeat_limit = app.config["SQL_REPEAT_WARN"]
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_sql_stats_start", None)
+        stats = _stats()
+        if started is None or stats is None:
+            return
+        elapsed = time.perf_counter() - started
+
+        shape = statement_shape(statement)
+        with stats.lock:
+            stats.count += 1
+            stats.db_time += elapsed
+            stats.shapes[shape] += 1
+            repeats = stats.shapes[shape]
+
+        if repeats == repeat_limit + 1:
+            # ek request me sirf ek baar per shape
+            log.warning("%s repeated the same statement %d+ times (N+1?): %s",
+                        request.endpoint, repeat_limit + 1, shape)
+
+        if elapsed >= slow:
+            log.warning("Slow query %.1fms in %s: %s params=%s",
+                        elapsed * 1000, request.endpoint, shape, redact(parameters))
+    return listener
+
+
+def _start_request():
+    g.sql_stats = RequestStats()
+
+
+def _add_server_timing(response):
+    stats = g.get("sql_stats")
+    if stats is None:
+        return response
+    total = (time.perf_counter() - stats.started) * 1000
+    response.headers.add("Server-Timing", f'db;dur={stats.db_time * 1000:.1f};desc="{stats.count} queries"')
+    response.headers.add("Server-Timing", f"app;dur={total:.1f}")
+    return response
+
+
+def _log_request(exc):
+    stats = g.pop("sql_stats", None)
+    if stats is not None and stats.count:
+        log.debug("%s %s: %d queries, db %.1fms, total %.1fms", request.method, request.endpoint,
+                  stats.count, stats.db_time * 1000, (time.perf_counter() - stats.started) * 1000)
+
+
+def init_app(app):
+    if not app.config["SQL_INSTRUMENT"]:
+        return
+
+    with app.app_context():
+        # primary + replica dono
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute(app))
+
+    app.before_request(_start_request)
+    app.after_request(_add_server_timing)
+    app.teardown_request(_log_request)
@@ -0,0 +1,153 @@
+import os
+import re
+import hashlib
+import tempfile
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.utils import secure_filename
+
+from extensions import db
+from models import Partner
+
+CHUNK_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".pdf"}
+
+# "<sha256><ext>" -- sirf yahi keys serve hoti hain, path traversal ka chance nahi
+KEY_RE = re.compile(r"^[0-9a-f]{64}\.(png|jpg|jpeg|pdf)$")
+
+DOCUMENT_FIELDS = ("bank_proof", "aadhar_doc", "pan_doc")
+# store se pehle ke uploads: "static/uploads/..." path, public static folder me
+LEGACY_PREFIX = "static/uploads/"
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+def _root():
+    return current_app.config["UPLOAD_ROOT"]
+
+
+def path_for(key):
+    # 2 level fan-out taaki ek directory me lakhon files na ho
+    return os.path.join(_root(), key[:2], key[2:4], key)
+
+
+def is_valid_key(key):
+    return bool(key and KEY_RE.match(key))
+
+
+def _extension(filename):
+    ext = os.path.splitext(secure_filename(filename or ""))[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise InvalidUpload("Only PNG, JPG or PDF files are allowed")
+    return ext
+
+
+def _store(stream, ext):
+    """Copy `stream` into the store; return (key, newly_written)."""
+    tmp_dir = os.path.join(_root(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+
+        key = digest.hexdigest() + ext
+        final_path = path_for(key)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+            return key, False
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        return key, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_upload(file_storage, created=None):
+    """Stream an upload to disk while hashing it; return its content key.
+
+    Identical bytes map to the same key, so re-uploads and the same scan
+    from different partners are stored once. Keys of files this call
+    actually wrote are appended to `created`, so the caller can discard()
+    them if the request fails later.
+    """
+    key, new = _store(file_storage.stream, _extension(file_storage.filename))
+    if new and created is not None:
+        created.append(key)
+    return key
+
+
+def discard(keys):
+    # sirf is request ke likhe naye files; pehle se maujood keys kabhi nahi aati
+    for key in keys:
+        try:
+            os.remove(path_for(key))
+        except FileNotFoundError:
+            pass
+
+
+def migrate_legacy_documents(echo=print):
+    """Move static/uploads documents into the store and rewrite the columns.
+
+    Files are deleted from static/uploads only after the new keys are
+    committed. Returns the number of documents moved.
+    """
+    legacy_root = os.path.realpath(os.path.join(current_app.root_path, LEGACY_PREFIX))
+    partners = Partner.query.filter(
+        db.or_(*[getattr(Partner, f).like(LEGACY_PREFIX + "%") for f in DOCUMENT_FIELDS])
+    ).all()
+
+    moved, kept = set(), set()
+    for partner in partners:
+        for field in DOCUMENT_FIELDS:
+            value = getattr(partner, field)
+            if not value or not value.startswith(LEGACY_PREFIX):
+                continue
+            path = os.path.realpath(os.path.join(current_app.root_path, value))
+            if not path.startswith(legacy_root + os.sep) or not os.path.isfile(path):
+                echo(f"partner {partner.id} {field}: {value} not found, left as is")
+                continue
+            try:
+                ext = _extension(path)
+            except InvalidUpload:
+                echo(f"partner {partner.id} {field}: {value} is not PNG/JPG/PDF, move it by hand")
+                kept.add(path)
+                continue
+            with open(path, "rb") as f:
+                key, _ = _store(f, ext)
+            setattr(partner, field, key)
+            moved.add(path)
+    db.session.commit()
+
+    # committed; ab public copies hatao (kisi row se na jude purane uploads bhi)
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(legacy_root, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if path not in kept:
+                os.remove(path)
+                removed += 1
+        if dirpath != legacy_root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    echo(f"{len(moved)} documents moved, {removed} files removed from {LEGACY_PREFIX}")
+    return len(moved)
+
+
+@click.command("migrate-legacy-documents")
+@with_appcontext
+def migrate_legacy_documents_command():
+    """Move pre-store KYC/bank uploads out of the public static folder."""
+    migrate_legacy_documents(echo=click.echo)
@@ -0,0 +1,20 @@
+from flask import current_app, Response, stream_with_context, get_flashed_messages
+
+
+def stream_page(template_name, **context):
+    """Render a template as a stream, so the header and sidebar reach the
+    browser while the table rows are still being rendered.
+
+    Pass row sources as lazy iterables (e.g. query.yield_per(...)) to keep
+    memory flat; the session stays open for the life of the stream.
+    """
+    app = current_app._get_current_object()
+    # session cookie body se pehle save hota hai; flashes abhi nikalo warna cookie me reh jaate hain
+    context.setdefault("flashed", get_flashed_messages(with_categories=True))
+    app.update_template_context(context)
+    template = app.jinja_env.get_or_select_template(template_name)
+
+    stream = template.stream(context)
+    # har chhote event pe write nahi, kuch events jama karke
+    stream.enable_buffering(current_app.config["STREAM_BUFFER_EVENTS"])
+    return Response(stream_with_context(stream), mimetype="text/html")